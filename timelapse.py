@@ -16,12 +16,27 @@ import subprocess
 import sys
 import argparse
 import logging
-from typing import List, Tuple, Dict, Union
+from typing import List, Tuple, Dict, Union, Callable
 import time
 import json
 import datetime
 import random
 import re
+import concurrent.futures
+import collections
+import threading
+import hashlib
+
+# NumPy is only needed to analyse the activity of the videos
+try:
+    import numpy as np
+except ImportError:
+    np = None
+# Pillow is only used to resize the images without starting FFmpeg for each one
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
 
 # Recording the starting time just for fun
 total_start = time.perf_counter()
@@ -90,6 +105,17 @@ class UserArguments:
         delete_custom_order,
         dont_save_custom_order,
         ignore_audio_check,
+        jobs,
+        probe_cache_size,
+        smart_fade,
+        renditions,
+        fast_speedup,
+        keyframe_only,
+        skip_idle,
+        min_idle_length,
+        variable_speed,
+        sequence_fps,
+        dedup,
     ) -> None:
         self.video_directory = video_directory
         self.audio_directory = audio_directory
@@ -150,6 +176,69 @@ class UserArguments:
         self.delete_custom_order = delete_custom_order
         self.dont_save_custom_order = dont_save_custom_order
         self.ignore_audio_check = ignore_audio_check
+        self.jobs = jobs
+        self.probe_cache_size = probe_cache_size
+        self.smart_fade = smart_fade
+        self.renditions = renditions
+        self.fast_speedup = fast_speedup
+        self.keyframe_only = keyframe_only
+        self.skip_idle = skip_idle
+        self.min_idle_length = min_idle_length
+        self.variable_speed = variable_speed
+        self.sequence_fps = sequence_fps
+        self.dedup = dedup
+
+
+# Function to parse the renditions argument (largest first, None if it isn't valid)
+def getRenditions(renditions: str) -> Union[List[dict], None]:
+    parsed = []
+    if renditions.strip() == "":
+        return parsed
+    for rendition in renditions.split(","):
+        match = re.fullmatch(r"\s*(\d+)x(\d+):(\d+):(fit|crop)\s*", rendition)
+        if match is None:
+            return None
+        parsed.append(
+            {
+                "width": int(match.group(1)),
+                "height": int(match.group(2)),
+                "crf": int(match.group(3)),
+                "mode": match.group(4),
+            }
+        )
+    # Check the values (the sizes are used for the output names so they can't repeat)
+    sizes = [(x["width"], x["height"]) for x in parsed]
+    if len(set(sizes)) != len(sizes):
+        return None
+    for rendition in parsed:
+        if rendition["width"] <= 0 or rendition["height"] <= 0 or rendition["crf"] > 51:
+            return None
+    # The largest fit rendition comes first (the clips are rendered from it so nothing is cropped from the fit renditions)
+    return sorted(
+        parsed,
+        key=lambda x: (x["mode"] == "fit", x["width"] * x["height"], x["width"]),
+        reverse=True,
+    )
+
+
+# Function to get the size the clips are rendered at so every rendition is only scaled down from it
+def getMasterSize(renditions: List[dict]) -> Tuple[int, int]:
+    # The clips have the aspect ratio of the largest fit rendition (or the largest crop if they're all cropped)
+    width = renditions[0]["width"]
+    height = renditions[0]["height"]
+    # How much the largest rendition has to be scaled up for each rendition (a portrait crop of a landscape output needs its height)
+    scale = 1
+    for rendition in renditions:
+        width_scale = rendition["width"] / width
+        height_scale = rendition["height"] / height
+        if rendition["mode"] == "crop":
+            scale = max(scale, width_scale, height_scale)
+        else:
+            scale = max(scale, min(width_scale, height_scale))
+    if scale == 1:
+        return (width, height)
+    # Round up to even sizes for the encoder
+    return (int(-(-width * scale // 2)) * 2, int(-(-height * scale // 2)) * 2)
 
 
 # Function to make sure passed paths exist
@@ -257,6 +346,9 @@ def getPaths() -> UserArguments:
     delete_custom_order = cli_args.delete_custom_order
     dont_save_custom_order = cli_args.dont_save_custom_order
     ignore_audio_check = cli_args.ignore_audio_check
+    smart_fade = cli_args.smart_fade
+    fast_speedup = cli_args.fast_speedup
+    keyframe_only = cli_args.keyframe_only
 
     # Validating other inputs
     if cli_args.output_fps > 0:
@@ -431,6 +523,60 @@ def getPaths() -> UserArguments:
     else:
         logger.critical("Invalid height: Must be an integer greater than 0.")
         valid_arguments = False
+    if cli_args.jobs >= 0:
+        jobs = cli_args.jobs
+    else:
+        logger.critical(
+            "Invalid jobs: Must be an integer equal to or greater than 0. 0 picks an amount from the CPU cores, 1 renders the clips one at a time (default)."
+        )
+        valid_arguments = False
+    if cli_args.probe_cache_size >= 0:
+        probe_cache_size = cli_args.probe_cache_size
+    else:
+        logger.critical(
+            "Invalid probe cache size: Must be an integer equal to or greater than 0. 0 to disable."
+        )
+        valid_arguments = False
+    # The clips are rendered at the largest rendition so every rendition is made from it
+    renditions = getRenditions(cli_args.renditions)
+    if renditions is None:
+        logger.critical(
+            "Invalid renditions: Must be a comma separated list of WIDTHxHEIGHT:CRF:fit or WIDTHxHEIGHT:CRF:crop with different sizes. CRF must be from 0 to 51."
+        )
+        valid_arguments = False
+    elif len(renditions) != 0:
+        width, height = getMasterSize(renditions)
+    if cli_args.skip_idle >= 0 and (cli_args.skip_idle == 0 or np is not None):
+        skip_idle = cli_args.skip_idle
+    else:
+        logger.critical(
+            "Invalid skip idle: Must be a float equal to or greater than 0 and needs NumPy installed. 0 to disable (default)."
+        )
+        valid_arguments = False
+    if cli_args.min_idle_length > 0:
+        min_idle_length = cli_args.min_idle_length
+    else:
+        logger.critical("Invalid min idle length: Must be a float greater than 0.")
+        valid_arguments = False
+    if cli_args.variable_speed >= 0 and (cli_args.variable_speed == 0 or np is not None):
+        variable_speed = cli_args.variable_speed
+    else:
+        logger.critical(
+            "Invalid variable speed: Must be a float equal to or greater than 0 and needs NumPy installed. 0 to disable (default)."
+        )
+        valid_arguments = False
+    if cli_args.sequence_fps > 0:
+        sequence_fps = cli_args.sequence_fps
+    else:
+        logger.critical("Invalid sequence fps: Must be a float greater than 0.")
+        valid_arguments = False
+    if -1 <= cli_args.dedup <= 64:
+        dedup = cli_args.dedup
+    else:
+        logger.critical(
+            "Invalid dedup: Must be an integer from 0 to 64. -1 to disable (default)."
+        )
+        valid_arguments = False
 
     # Close application if inputs aren't valid
     if not valid_arguments:
@@ -498,6 +644,17 @@ def getPaths() -> UserArguments:
         delete_custom_order,
         dont_save_custom_order,
         ignore_audio_check,
+        jobs,
+        probe_cache_size,
+        smart_fade,
+        renditions,
+        fast_speedup,
+        keyframe_only,
+        skip_idle,
+        min_idle_length,
+        variable_speed,
+        sequence_fps,
+        dedup,
     )
 
 
@@ -516,12 +673,124 @@ def getFiles(search_path: pathlib.Path, file_names: List[str]) -> list:
     return file_list
 
 
+# Function to get the key to naturally sort files by (numbers are compared as numbers like defaultOrder)
+def naturalKey(file: pathlib.Path) -> List[Tuple[int, Union[int, str]]]:
+    key = []
+    for x in re.split("([0-9]+)", file.name):
+        # Remove the empty strings the split returns
+        if x == "":
+            continue
+        # Numbers come before letters
+        if x.isdigit():
+            key.append((0, int(x)))
+        else:
+            key.append((1, x))
+    return key
+
+
+# Function to get the frames of an image sequence in order (only listing the directory once)
+def getSequenceFrames(directory: pathlib.Path) -> List[pathlib.Path]:
+    with sequence_lock:
+        if directory not in sequence_frames:
+            frames = getFiles(directory, [".png", ".jpg"])
+            sequence_frames[directory] = sorted(frames, key=naturalKey)
+        return sequence_frames[directory]
+
+
+# Function to get the image sequences from a directory (the directories of images in it)
+def getSequences(search_path: pathlib.Path) -> list:
+    sequence_list = []
+    for directory in search_path.iterdir():
+        # Check if it's a directory
+        if not directory.is_dir():
+            continue
+        # Check that it has frames
+        if len(getSequenceFrames(directory)) == 0:
+            continue
+        # Add the sequence
+        sequence_list.append(directory)
+    return sequence_list
+
+
+# Function to get the input terms of a file (image sequences are read as one video)
+def inputTerms(file: pathlib.Path) -> str:
+    if not file.is_dir():
+        return f'-i "{file}"'
+    # The terms are only made once while holding the lock (parallel jobs would rewrite the frame list while it's read)
+    with sequence_lock:
+        if file not in sequence_inputs:
+            sequence_inputs[file] = sequenceTerms(file)
+        return sequence_inputs[file]
+
+
+# Function to make the input terms of an image sequence
+def sequenceTerms(file: pathlib.Path) -> str:
+    frames = getSequenceFrames(file)
+    # If the duplicate frames were collapsed list every unique frame with how long it's shown
+    if file in sequence_runs:
+        return sequenceConcat(file, sequence_runs[file])
+    # Check if the frames are numbered in a way the image2 demuxer can read them (the same name with consecutive numbers)
+    pattern = None
+    match = re.fullmatch(r"(.*?)([0-9]+)(\.[A-Za-z]+)", frames[0].name)
+    if match is not None:
+        prefix, number, suffix = match.groups()
+        numbers = []
+        for frame in frames:
+            frame_match = re.fullmatch(
+                re.escape(prefix) + r"([0-9]+)" + re.escape(suffix), frame.name
+            )
+            if frame_match is None:
+                break
+            numbers.append(frame_match.group(1))
+        first = int(numbers[0])
+        # The numbers are padded with zeros to the width of the first one (the later ones can outgrow it)
+        width = len(numbers[0])
+        if (
+            len(numbers) == len(frames)
+            and all(x == f"{int(x):0{width}d}" for x in numbers)
+            and [int(x) for x in numbers] == list(range(first, first + len(frames)))
+        ):
+            # The % in the path have to be escaped
+            pattern = os.path.join(str(file), prefix).replace("%", "%%")
+            pattern += f"%0{width}d{suffix}"
+            terms = f'-framerate {timelapse_args.sequence_fps} -start_number {first} -i "{pattern}"'
+    # If not list the frames in a concat file
+    if pattern is None:
+        logger.info(f'The frames of "{file}" aren\'t numbered in order, listing them')
+        terms = sequenceConcat(file, [(frame, 1) for frame in frames])
+    return terms
+
+
+# Function to list the frames of an image sequence in a concat file (with how many frames each one is shown for)
+def sequenceConcat(file: pathlib.Path, runs: List[Tuple[pathlib.Path, int]]) -> str:
+    concat_sequence = pathlib.Path.joinpath(
+        timelapse_args.temp_directory, f"{file.name}_sequence_frames.txt"
+    )
+    logger.info(f'Creating the frame list of "{file}" at "{concat_sequence}"')
+    frame_lines = []
+    for frame, count in runs:
+        frame_string = str(frame.resolve()).replace("'", "'\\''")
+        frame_lines.append(
+            f"file '{frame_string}'\nduration {count / timelapse_args.sequence_fps}\n"
+        )
+    # The last frame is listed again so its duration isn't lost
+    frame_lines.append(frame_lines[-1].split("\n")[0] + "\n")
+    with open(concat_sequence, "w+") as wfile:
+        wfile.write("".join(frame_lines))
+    return f'-f concat -safe 0 -i "{concat_sequence}"'
+
+
+# Function to check if a file is a video source (image sequences are videos too)
+def checkVideo(file: pathlib.Path) -> bool:
+    return file.is_dir() or file.suffix.lower() in [".mp4", ".mkv"]
+
+
 # Function to create the concat file for ffmpeg
 def concatFile(
     files_d: Dict[int, pathlib.Path], output: pathlib.Path, utype: bool
-) -> None:
+) -> List[pathlib.Path]:
     # Grab just the values from the dict
-    files = files_d.values()
+    files = list(files_d.values())
     # What type of file it is and randomizing if needed
     if utype:
         ustr = "video"
@@ -532,6 +801,14 @@ def concatFile(
         if timelapse_args.randomize_audio:
             random.shuffle(files)
     logger.info(f'Creating the {ustr} concat file at "{output}"')
+    writeConcat(files, output)
+    logger.info(f'Created the {ustr} concat file at "{output}"')
+    # Return the files in the order they were written
+    return files
+
+
+# Function to write a list of files to a concat file
+def writeConcat(files: List[pathlib.Path], output: pathlib.Path) -> None:
     # New list to actually use
     temp_str = ""
     for file in files:
@@ -542,53 +819,762 @@ def concatFile(
         temp_str += f"file '{file_string}'\n"
     with open(output, "w+") as file:
         file.write(temp_str)
-    logger.info(f'Created the {ustr} concat file at "{output}"')
 
 
-# Function to use ffprobe to get the length of the file
-def getLength(file: pathlib.Path) -> float:
-    terms = f'ffprobe -v error -show_entries format=duration -of default=noprint_wrappers=1:nokey=1 "{file}"'
-    ffprobe = subprocess.Popen(
-        terms, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+# Function to get the identity of a file (so changed files aren't read from the caches)
+def fileIdentity(file: pathlib.Path) -> Union[Tuple[str, int, int], None]:
+    if os.path.isdir(file):
+        return sequenceIdentity(pathlib.Path(file))
+    try:
+        stat = os.stat(file)
+    except OSError:
+        return None
+    return (str(pathlib.Path(file).resolve()), stat.st_size, stat.st_mtime_ns)
+
+
+# Function to get the identity of an image sequence from its frames (editing a frame doesn't change the directory)
+def sequenceIdentity(directory: pathlib.Path) -> Union[Tuple[str, int, int], None]:
+    with sequence_lock:
+        if directory in sequence_identities:
+            return sequence_identities[directory]
+    # Adding, removing, or renaming a frame changes the directory, and editing one changes the frame
+    try:
+        stats = [os.stat(frame) for frame in getSequenceFrames(directory)]
+        stats.append(os.stat(directory))
+    except OSError:
+        return None
+    identity = (
+        str(directory.resolve()),
+        sum(x.st_size for x in stats[:-1]),
+        max(x.st_mtime_ns for x in stats),
     )
-    # Run the command and get the result
-    duration, err = ffprobe.communicate()
-    return float(duration)
+    with sequence_lock:
+        sequence_identities[directory] = identity
+    return identity
+
+
+# Class to store the entries of a cache in a JSON file between runs
+class JsonCache:
+    # The name used in the logs and how the file is indented (None for big caches)
+    name = "JSON"
+    indent = 4
+
+    def __init__(self, cache_file: pathlib.Path) -> None:
+        self.cache_file = cache_file
+        self.entries = {}
+        # Lock because the caches are used from multiple threads
+        self.lock = threading.Lock()
+        self.changed = False
+
+    # Function to load the cache from its file
+    def load(self) -> None:
+        if not checkPath(self.cache_file):
+            return
+        try:
+            with open(self.cache_file, "r") as json_file:
+                self.entries = json.load(json_file)
+            logger.info(f"Loaded the {self.name} cache from {self.cache_file}")
+        except:
+            self.entries = {}
+            logger.warning(
+                f"{self.name.capitalize()} cache file {self.cache_file} is invalid and will be ignored"
+            )
 
+    # Function to write the cache to its file (if anything changed)
+    def save(self) -> None:
+        with self.lock:
+            if not self.changed:
+                return
+            self.changed = False
+            try:
+                createDir(self.cache_file.parent)
+                with open(self.cache_file, "w+") as json_file:
+                    json_file.write(json.dumps(self.entries, indent=self.indent))
+                logger.info(f"Saved the {self.name} cache at {self.cache_file}")
+            except:
+                logger.warning(f"Couldn't save the {self.name} cache at {self.cache_file}")
+
+    # Function to get the entry of a file if the file hasn't changed since it was added (None if it isn't cached)
+    def getEntry(self, file: pathlib.Path) -> Union[dict, None]:
+        identity = fileIdentity(file)
+        if identity is None:
+            return None
+        path, size, mtime_ns = identity
+        with self.lock:
+            entry = self.entries.get(path)
+            if entry is None or entry["size"] != size or entry["mtime_ns"] != mtime_ns:
+                return None
+            return entry
+
+    # Function to add the entry of a file (with the identity it has now)
+    def setEntry(self, file: pathlib.Path, entry: dict) -> None:
+        identity = fileIdentity(file)
+        if identity is None:
+            return
+        path, size, mtime_ns = identity
+        with self.lock:
+            self.entries[path] = {"size": size, "mtime_ns": mtime_ns, **entry}
+            self.changed = True
 
-# Function to use ffprobe to get the resolution of a file
-def getResolution(file: pathlib.Path) -> Tuple[int, int]:
-    terms = f'ffprobe -v error -select_streams v -show_entries stream=width,height -of csv=p=0:s=x "{file}"'
+
+# Class to store the ffprobe results of files between runs
+class ProbeCache(JsonCache):
+    name = "probe"
+
+    def __init__(self, cache_file: pathlib.Path, max_entries: int) -> None:
+        super().__init__(cache_file)
+        self.max_entries = max_entries
+        # Ordered from least to most recently used
+        self.entries = collections.OrderedDict()
+
+    # Function to load the cache from the settings directory
+    def load(self) -> None:
+        if self.max_entries == 0:
+            return
+        super().load()
+        self.entries = collections.OrderedDict(self.entries)
+
+    # Function to write the cache to the settings directory
+    def save(self) -> None:
+        if self.max_entries == 0:
+            return
+        super().save()
+
+    # Function to get the cached metadata of a file (None if it isn't cached)
+    def get(self, file: pathlib.Path) -> Union[dict, None]:
+        entry = self.getEntry(file)
+        if entry is None:
+            return None
+        # Mark it as recently used
+        path = str(pathlib.Path(file).resolve())
+        with self.lock:
+            if path in self.entries:
+                self.entries.move_to_end(path)
+        return entry["metadata"]
+
+    # Function to add the metadata of a file to the cache
+    def set(self, file: pathlib.Path, metadata: dict) -> None:
+        self.setEntry(file, {"metadata": metadata})
+        path = str(pathlib.Path(file).resolve())
+        with self.lock:
+            if path in self.entries:
+                self.entries.move_to_end(path)
+            # Remove the least recently used files if the cache is too big (only kept for this run if 0)
+            while self.max_entries != 0 and len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+
+# Class to store what every temp file was rendered from (so changed clips are rendered again)
+class RenderCache(JsonCache):
+    name = "render"
+
+    # Function to get the key a temp file was rendered with (None if it isn't known)
+    def get(self, output: pathlib.Path) -> Union[str, None]:
+        with self.lock:
+            return self.entries.get(output.name)
+
+    # Function to record the key a temp file was rendered with
+    def set(self, output: pathlib.Path, key: str) -> None:
+        with self.lock:
+            self.entries[output.name] = key
+            self.changed = True
+        # Save it right away so a stopped run still knows what was rendered
+        self.save()
+
+
+# Class to store the activity of the analysed videos as NumPy arrays (so the videos aren't analysed again)
+class AnalysisCache(JsonCache):
+    name = "analysis"
+
+    def __init__(self, cache_directory: pathlib.Path) -> None:
+        # The index of the arrays is the JSON file
+        super().__init__(pathlib.Path.joinpath(cache_directory, "index.json"))
+        self.cache_directory = cache_directory
+        # The arrays that have been loaded or analysed in this run
+        self.arrays = {}
+        # The identities of the videos that couldn't be analysed in this run
+        self.failed = set()
+
+    # Function to record that a video couldn't be analysed (so it isn't decoded again in this run)
+    def setFailed(self, file: pathlib.Path) -> None:
+        identity = fileIdentity(file)
+        if identity is None:
+            return
+        with self.lock:
+            self.failed.add(identity)
+
+    # Function to check if a video couldn't be analysed in this run
+    def checkFailed(self, file: pathlib.Path) -> bool:
+        identity = fileIdentity(file)
+        with self.lock:
+            return identity in self.failed
+
+    # Function to get the settings the activity of a video was analysed with
+    def settings(self, file: pathlib.Path) -> dict:
+        settings = {"width": analysis_width, "fps": analysis_fps}
+        # The framerate of an image sequence changes its timeline
+        if os.path.isdir(file):
+            settings["sequence_fps"] = timelapse_args.sequence_fps
+        return settings
+
+    # Function to get the cached activity of a video (None if it isn't cached)
+    def get(self, file: pathlib.Path) -> Union["np.ndarray", None]:
+        path = str(pathlib.Path(file).resolve())
+        with self.lock:
+            if path in self.arrays:
+                return self.arrays[path]
+        entry = self.getEntry(file)
+        # Ignore the entry if it was analysed with other settings
+        if entry is None or entry["settings"] != self.settings(file):
+            return None
+        array_file = pathlib.Path.joinpath(self.cache_directory, entry["array"])
+        # Memory map the array so it's only read when it's used
+        try:
+            activity = np.load(array_file, mmap_mode="r")
+        except:
+            logger.warning(f"Analysis cache array {array_file} is invalid and will be ignored")
+            return None
+        with self.lock:
+            self.arrays[path] = activity
+        return activity
+
+    # Function to add the activity of a video to the cache
+    def set(self, file: pathlib.Path, activity: "np.ndarray") -> None:
+        path = str(pathlib.Path(file).resolve())
+        # Each source has one array named from its path
+        array_name = f"{hashlib.sha1(path.encode()).hexdigest()}.npy"
+        with self.lock:
+            self.arrays[path] = activity
+        self.setEntry(file, {"settings": self.settings(file), "array": array_name})
+        # Save it right away so a stopped run doesn't analyse it again
+        try:
+            createDir(self.cache_directory)
+            np.save(pathlib.Path.joinpath(self.cache_directory, array_name), activity)
+        except:
+            logger.warning(f"Couldn't save the analysis cache at {self.cache_directory}")
+        self.save()
+
+    # Function to get all the files of the cache
+    def files(self) -> List[pathlib.Path]:
+        files = [
+            pathlib.Path.joinpath(self.cache_directory, entry["array"])
+            for entry in self.entries.values()
+        ]
+        return files + [self.cache_file]
+
+
+# Class to store the hashes of the images and frames (so they aren't read again to find the duplicates)
+class DedupCache(JsonCache):
+    name = "dedup"
+    # There's an entry for every frame of the image sequences so it isn't indented
+    indent = None
+
+    # Function to get the cached hashes of a file (None if it isn't cached)
+    def get(self, file: pathlib.Path) -> Union[dict, None]:
+        entry = self.getEntry(file)
+        if entry is None:
+            return None
+        return entry["hashes"]
+
+    # Function to add the hashes of a file to the cache
+    def set(self, file: pathlib.Path, hashes: dict) -> None:
+        self.setEntry(file, {"hashes": hashes})
+
+
+# Function to use ffprobe to get all the metadata of a file in one call
+def probeFile(file: pathlib.Path) -> dict:
+    # An image sequence is probed from its first frame (and its length from the amount of frames)
+    if file.is_dir():
+        frames = getSequenceFrames(file)
+        metadata = dict(probeFile(frames[0]))
+        metadata["duration"] = len(frames) / timelapse_args.sequence_fps
+        metadata["framerate"] = round(float(timelapse_args.sequence_fps), 2)
+        # Every frame is a keyframe
+        metadata["keyframe_interval"] = 1 / timelapse_args.sequence_fps
+        return metadata
+    # Check if the file has already been probed (and has every value in the record)
+    cached = probe_cache.get(file)
+    if cached is not None and all(field in cached for field in probe_fields):
+        return cached
+    # Get the format and the streams
+    terms = (
+        f"ffprobe -v error -of json "
+        f"-show_entries format=duration:stream=index,codec_type,codec_name,profile,width,height,pix_fmt,r_frame_rate,time_base,sample_rate "
+        f'"{file}"'
+    )
     ffprobe = subprocess.Popen(
         terms, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
     )
     # Run the command and get the result
-    resolution, err = ffprobe.communicate()
-    resolution = resolution.split("x")
-    resolution[1] = resolution[1].strip("\n")
-    return (int(resolution[0]), int(resolution[1]))
+    result, err = ffprobe.communicate()
+    data = json.loads(result)
+    # The record that is returned (None if the file doesn't have the value)
+    metadata = dict.fromkeys(probe_fields)
+    # Get the duration
+    if "duration" in data.get("format", {}):
+        metadata["duration"] = float(data["format"]["duration"])
+    # Get the first video and audio streams
+    video_stream = None
+    audio_stream = None
+    for stream in data.get("streams", []):
+        if stream.get("codec_type") == "video" and video_stream is None:
+            video_stream = stream
+        elif stream.get("codec_type") == "audio" and audio_stream is None:
+            audio_stream = stream
+    # Get the video values
+    if video_stream is not None:
+        metadata["resolution"] = (int(video_stream["width"]), int(video_stream["height"]))
+        terms = video_stream["r_frame_rate"].split("/")
+        if int(terms[1]) != 0:
+            metadata["framerate"] = round(float(int(terms[0]) / int(terms[1])), 2)
+        metadata["codec"] = video_stream.get("codec_name")
+        metadata["profile"] = video_stream.get("profile")
+        metadata["pix_fmt"] = video_stream.get("pix_fmt")
+        metadata["time_base"] = video_stream.get("time_base")
+    # If there isn't a video stream use the audio codec
+    elif audio_stream is not None:
+        metadata["codec"] = audio_stream.get("codec_name")
+    # Get the audio values
+    if audio_stream is not None:
+        metadata["audio_codec"] = audio_stream.get("codec_name")
+        if "sample_rate" in audio_stream:
+            metadata["sample_rate"] = int(audio_stream["sample_rate"])
+    # Add it to the cache
+    probe_cache.set(file, metadata)
+    return metadata
+
+
+# Function to get the keyframe interval of a source video (only probing the packets the first time it's needed)
+def getKeyframeInterval(file: pathlib.Path) -> Union[float, None]:
+    metadata = probeFile(file)
+    # Image sequences have one from their framerate
+    if metadata.get("keyframe_interval") is not None:
+        return metadata["keyframe_interval"]
+    keyframe_interval = probeKeyframeInterval(file)
+    probe_cache.set(file, {**metadata, "keyframe_interval": keyframe_interval})
+    return keyframe_interval
+
+
+# Function to get the average time between the first keyframes of the video stream (None if it has less than 2)
+def probeKeyframeInterval(file: pathlib.Path) -> Union[float, None]:
+    terms = f'ffprobe -v error -select_streams v:0 -of compact=p=0 -show_entries packet=pts_time,flags "{file}"'
+    ffprobe = subprocess.Popen(
+        terms, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+    )
+    # Only read the packets until enough keyframes have been seen (long GOPs can be thousands of packets)
+    keyframes = []
+    for line in ffprobe.stdout:
+        packet = dict(x.split("=", 1) for x in line.strip().split("|") if "=" in x)
+        if "K" in packet.get("flags", "") and packet.get("pts_time", "N/A") != "N/A":
+            keyframes.append(float(packet["pts_time"]))
+            if len(keyframes) >= keyframe_count:
+                break
+    ffprobe.kill()
+    ffprobe.wait()
+    if len(keyframes) < 2:
+        return None
+    keyframes.sort()
+    return (keyframes[-1] - keyframes[0]) / (len(keyframes) - 1)
+
+
+# Function to probe many files at the same time (the results are stored in the probe cache)
+def probeFiles(files: List[pathlib.Path]) -> None:
+    # Only probe the files that aren't already cached
+    uncached = []
+    for file in files:
+        cached = probe_cache.get(file)
+        if cached is None or not all(field in cached for field in probe_fields):
+            uncached.append(file)
+    if len(uncached) == 0:
+        return
+    logger.info(f"Probing {len(uncached)} files")
+    start = time.perf_counter()
+    # Probing is mostly waiting on ffprobe to start, so use more threads than cores
+    workers = min(max_probe_jobs, len(uncached))
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(probeFile, file): file for file in uncached}
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                future.result()
+            except Exception:
+                logger.warning(f'Couldn\'t probe the file "{futures[future]}"')
+    end = time.perf_counter()
+    duration = end - start
+    logger.info(f"Probed {len(uncached)} files after {duration} seconds")
+
+
+# Function to get the length of the file
+def getLength(file: pathlib.Path) -> float:
+    return probeFile(file)["duration"]
+
+
+# Function to get the resolution of a file
+def getResolution(file: pathlib.Path) -> Tuple[int, int]:
+    resolution = probeFile(file)["resolution"]
+    return (resolution[0], resolution[1])
 
 
 # Function to get the framerate of the file
 def getFramerate(file: pathlib.Path) -> float:
-    terms = f'ffprobe -v error -select_streams v -of default=noprint_wrappers=1:nokey=1 -show_entries stream=r_frame_rate "{file}"'
-    ffprobe = subprocess.Popen(
-        terms, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+    return probeFile(file)["framerate"]
+
+
+# Function to get the SHA-256 of a file (identical files have the same one)
+def hashFile(file: pathlib.Path) -> str:
+    sha = hashlib.sha256()
+    with open(file, "rb") as rfile:
+        for chunk in iter(lambda: rfile.read(1048576), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+# Function to get the perceptual hashes (dHash) of images of the same type with one FFmpeg call per batch
+def perceptualHashes(files: List[pathlib.Path]) -> List[Union[int, None]]:
+    hashes = []
+    for batch_start in range(0, len(files), dedup_batch):
+        hashes += perceptualHashBatch(files[batch_start : batch_start + dedup_batch])
+    return hashes
+
+
+# Function to get the perceptual hashes of a batch of images (all None if any of them couldn't be decoded)
+def perceptualHashBatch(files: List[pathlib.Path]) -> List[Union[int, None]]:
+    concat_images = pathlib.Path.joinpath(timelapse_args.temp_directory, "dedup.txt")
+    writeConcat(files, concat_images)
+    # Every image is shrunk to 9x8 gray pixels
+    terms = f'ffmpeg -v error -f concat -safe 0 -i "{concat_images}" -vf "scale=9:8,format=gray" -fps_mode passthrough -f rawvideo -'
+    ffmpeg = subprocess.Popen(
+        terms, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
     )
-    # Run the command and get the result
-    result, err = ffprobe.communicate()
-    terms = result.split("/")
-    framerate = round(float(int(terms[0]) / int(terms[1])), 2)
-    return framerate
+    hashes = []
+    while True:
+        frame = ffmpeg.stdout.read(72)
+        if len(frame) < 72:
+            break
+        # Each bit is whether a pixel is brighter than the one to the right of it
+        dhash = 0
+        for row in range(8):
+            for column in range(8):
+                pixel = row * 9 + column
+                dhash = (dhash << 1) | (frame[pixel] > frame[pixel + 1])
+        hashes.append(dhash)
+    return_code = ffmpeg.wait()
+    os.remove(concat_images)
+    # The frames are only matched to the images by their order, so if one is missing none of them can be trusted
+    if return_code != 0 or len(hashes) != len(files):
+        logger.warning(
+            f"Couldn't get the perceptual hashes of {len(files)} images, they're only deduplicated if they're identical"
+        )
+        return [None] * len(files)
+    return hashes
+
+
+# Function to get the hashes of images and frames (only hashing them if they aren't cached)
+def hashImages(files: List[pathlib.Path]) -> Dict[pathlib.Path, dict]:
+    hashes = {}
+    uncached = []
+    for file in files:
+        cached = dedup_cache.get(file)
+        # The perceptual hash is only needed for near duplicates
+        if cached is None or (timelapse_args.dedup != 0 and "dhash" not in cached):
+            uncached.append(file)
+        else:
+            hashes[file] = cached
+    if len(uncached) == 0:
+        return hashes
+    logger.info(f"Hashing {len(uncached)} images")
+    start = time.perf_counter()
+    # Hashing is mostly waiting on the disk, so use more threads than cores
+    workers = min(max_probe_jobs, len(uncached))
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        content_hashes = list(executor.map(hashFile, uncached))
+    perceptual_hashes = {}
+    if timelapse_args.dedup != 0:
+        # The concat demuxer can't change the decoder, so every type of image is decoded separately
+        for suffix in set(file.suffix.lower() for file in uncached):
+            same_type = [file for file in uncached if file.suffix.lower() == suffix]
+            perceptual_hashes.update(zip(same_type, perceptualHashes(same_type)))
+    for file, content_hash in zip(uncached, content_hashes):
+        file_hashes = {"sha256": content_hash}
+        if file in perceptual_hashes and perceptual_hashes[file] is not None:
+            file_hashes["dhash"] = perceptual_hashes[file]
+        dedup_cache.set(file, file_hashes)
+        hashes[file] = file_hashes
+    end = time.perf_counter()
+    duration = end - start
+    logger.info(f"Hashed {len(uncached)} images after {duration} seconds")
+    return hashes
+
+
+# Function to check if two images are duplicates from their hashes
+def checkDuplicate(first: dict, second: dict) -> bool:
+    if first["sha256"] == second["sha256"]:
+        return True
+    if timelapse_args.dedup == 0 or "dhash" not in first or "dhash" not in second:
+        return False
+    # Count how many bits of the perceptual hashes are different
+    return bin(first["dhash"] ^ second["dhash"]).count("1") <= timelapse_args.dedup
+
+
+# Function to find the duplicate images and the runs of duplicate frames in the image sequences
+def dedupFiles(images: List[pathlib.Path], sequences: List[pathlib.Path]) -> None:
+    # Every image that's a duplicate of an earlier one uses that image
+    image_hashes = hashImages(images)
+    # The image each content hash is shown as (identical images are found without comparing them)
+    content_images = {}
+    unique_images = []
+    for image in images:
+        content_hash = image_hashes[image]["sha256"]
+        unique_image = content_images.get(content_hash)
+        # Near duplicates are only looked for in the last unique images (like the neighbouring frames of a sequence)
+        if unique_image is None and timelapse_args.dedup != 0:
+            for previous_image in reversed(unique_images[-dedup_window:]):
+                if checkDuplicate(image_hashes[previous_image], image_hashes[image]):
+                    unique_image = previous_image
+                    break
+        if unique_image is None:
+            content_images[content_hash] = image
+            unique_images.append(image)
+            continue
+        content_images[content_hash] = unique_image
+        duplicate_images[image] = unique_image
+        logger.info(f'"{image}" is a duplicate of "{unique_image}"')
+    # Every frame that's a duplicate of the first frame of its run is shown as part of it
+    for sequence in sequences:
+        frames = getSequenceFrames(sequence)
+        frame_hashes = hashImages(frames)
+        runs = []
+        for frame in frames:
+            if len(runs) != 0 and checkDuplicate(frame_hashes[runs[-1][0]], frame_hashes[frame]):
+                runs[-1] = (runs[-1][0], runs[-1][1] + 1)
+            else:
+                runs.append((frame, 1))
+        if len(runs) != len(frames):
+            sequence_runs[sequence] = runs
+            logger.info(
+                f'Collapsed {len(frames) - len(runs)} duplicate frames of "{sequence}"'
+            )
+
+
+# Function to analyse how much a video changes every second (the average difference between small gray frames)
+def analyseActivity(file: pathlib.Path) -> Union["np.ndarray", None]:
+    # Keep the aspect ratio of the analysed frames
+    width, height = getResolution(file)
+    analysis_height = max(2, int(round(analysis_width * height / width / 2)) * 2)
+    frame_size = analysis_width * analysis_height
+    logger.info(f'Analysing the activity of "{file}"')
+    start = time.perf_counter()
+    terms = f'ffmpeg -v error {inputTerms(file)} -vf "fps={analysis_fps},scale={analysis_width}:{analysis_height},format=gray" -f rawvideo -'
+    ffmpeg = subprocess.Popen(
+        terms, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+    )
+    # Compare every frame to the one before it as they're decoded
+    differences = []
+    previous = None
+    while True:
+        frame = ffmpeg.stdout.read(frame_size)
+        if len(frame) < frame_size:
+            break
+        current = np.frombuffer(frame, dtype=np.uint8).astype(np.int16)
+        if previous is not None:
+            differences.append(np.abs(current - previous).mean())
+        previous = current
+    # If FFmpeg failed the activity is incomplete
+    if ffmpeg.wait() != 0:
+        return None
+    end = time.perf_counter()
+    duration = end - start
+    logger.info(f'Analysed the activity of "{file}" after {duration} seconds')
+    return np.array(differences, dtype=np.float32)
+
+
+# Function to get the activity of a video (only analysing it if it isn't cached, None if it can't be analysed)
+def getActivity(file: pathlib.Path) -> Union["np.ndarray", None]:
+    activity = analysis_cache.get(file)
+    # Don't decode a video that already failed again
+    if activity is not None or analysis_cache.checkFailed(file):
+        return activity
+    try:
+        activity = analyseActivity(file)
+    except Exception:
+        activity = None
+    if activity is None:
+        logger.warning(
+            f'Couldn\'t analyse the file "{file}", its idle parts won\'t be skipped and its speed won\'t follow its activity'
+        )
+        analysis_cache.setFailed(file)
+        return None
+    analysis_cache.set(file, activity)
+    return activity
+
+
+# Function to analyse many videos at the same time
+def analyseFiles(files: List[pathlib.Path]) -> None:
+    jobs, threads = getJobThreads(len(files))
+    with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as executor:
+        # The failures are logged and recorded by getActivity
+        for file in files:
+            executor.submit(getActivity, file)
+
+
+# Function to get the times of a video where it's idle for long enough to be skipped
+def getIdleRanges(file: pathlib.Path) -> List[Tuple[float, float]]:
+    # Idle skipping is only for the source videos (the audio would have to be cut too)
+    if (
+        timelapse_args.skip_idle == 0
+        or timelapse_args.preserve_audio
+        or not checkVideo(file)
+        or file.parent == timelapse_args.temp_directory
+    ):
+        return []
+    activity = getActivity(file)
+    if activity is None:
+        return []
+    idle = activity < timelapse_args.skip_idle
+    # Find where the idle runs start and end (difference i is from second i to i + 1)
+    edges = np.diff(np.concatenate(([0], idle.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    ranges = []
+    for run_start, run_end in zip(starts, ends):
+        if (run_end - run_start) / analysis_fps >= timelapse_args.min_idle_length:
+            ranges.append((int(run_start) / analysis_fps, int(run_end) / analysis_fps))
+    return ranges
+
+
+# Function to get where a clip starts in its source and how long it is
+def getClipRange(
+    file: pathlib.Path,
+    cut_in: float,
+    cut_out: float,
+    cut_from_end: bool,
+    duration: Union[float, None] = None,
+) -> Tuple[float, float]:
+    if duration is None:
+        duration = getLength(file)
+    if cut_in != 0 or cut_out != 0:
+        cut_duration = getClipTime(file, cut_in, cut_out, cut_from_end, False, duration)
+        return (cut_duration["cut_in"], cut_duration["output_length"])
+    return (0, duration)
+
+
+# Function to get the idle times of a clip (from the start of the clip)
+def getClipIdleRanges(
+    file: pathlib.Path,
+    cut_in: float,
+    cut_out: float,
+    cut_from_end: bool,
+    duration: Union[float, None] = None,
+) -> List[Tuple[float, float]]:
+    ranges = getIdleRanges(file)
+    if len(ranges) == 0:
+        return ranges
+    # Get the part of the video that's in the clip
+    clip_start, clip_length = getClipRange(file, cut_in, cut_out, cut_from_end, duration)
+    # Move the ranges to the clip times
+    clipped = []
+    for range_start, range_end in ranges:
+        range_start = max(range_start - clip_start, 0)
+        range_end = min(range_end - clip_start, clip_length)
+        if range_end > range_start:
+            clipped.append((range_start, range_end))
+    # Keep the whole clip if all of it is idle
+    if sum(x[1] - x[0] for x in clipped) >= clip_length:
+        logger.warning(f'The clip of "{file}" is idle the whole time so it isn\'t skipped')
+        return []
+    return clipped
+
+
+# Function to get the speed of every part so the output time of each follows its weight and they add up to the target (never slower than real time)
+def fitSpeeds(lengths: List[float], weights: List[float], target: float) -> List[float]:
+    real_time = set()
+    while True:
+        free = [x for x in range(len(lengths)) if x not in real_time]
+        if len(free) == 0:
+            break
+        # Scale the weighted lengths of the parts that aren't at real time to fill the rest of the target
+        remaining = target - sum(lengths[x] for x in real_time)
+        scale = remaining / sum(lengths[x] * weights[x] for x in free)
+        # Parts that would be slowed down are kept at real time instead
+        slowed = [x for x in free if weights[x] * scale > 1]
+        if len(slowed) == 0:
+            break
+        real_time.update(slowed)
+    return [1 if x in real_time else 1 / (weights[x] * scale) for x in range(len(lengths))]
+
+
+# Function to get the parts of a clip with their speeds (None for the idle parts), empty if the whole clip has one speed
+def getClipSegments(
+    file: pathlib.Path,
+    speed_factor: float,
+    cut_in: float,
+    cut_out: float,
+    cut_from_end: bool,
+    duration: Union[float, None] = None,
+) -> List[Tuple[float, float, Union[float, None]]]:
+    idle_ranges = getClipIdleRanges(file, cut_in, cut_out, cut_from_end, duration)
+    # Variable speed is only for sped up videos (the audio would have to be changed too)
+    variable = (
+        timelapse_args.variable_speed != 0
+        and not timelapse_args.preserve_audio
+        and checkVideo(file)
+        and speed_factor > 1
+    )
+    # If the video couldn't be analysed use the constant speed
+    activity = getActivity(file) if variable else None
+    if activity is None:
+        variable = False
+    if len(idle_ranges) == 0 and not variable:
+        return []
+    clip_start, clip_length = getClipRange(file, cut_in, cut_out, cut_from_end, duration)
+    speed = speed_factor if speed_factor != 0 and speed_factor != 1 else 1
+    # Split the clip at the idle parts (and into windows if using variable speed)
+    boundaries = {0, clip_length}
+    for range_start, range_end in idle_ranges:
+        boundaries.update([range_start, range_end])
+    if variable:
+        boundaries.update(np.arange(0, clip_length, variable_speed_window).tolist())
+    boundaries = sorted(boundaries)
+    segments = []
+    for segment_start, segment_end in zip(boundaries[:-1], boundaries[1:]):
+        idle = any(x[0] <= segment_start and segment_end <= x[1] for x in idle_ranges)
+        segments.append([segment_start, segment_end, None if idle else speed])
+    # Give every active part a speed from its activity (keeping the length of the constant speed)
+    if variable:
+        active = [x for x in segments if x[2] is not None]
+        lengths = [x[1] - x[0] for x in active]
+        weights = []
+        for segment_start, segment_end, segment_speed in active:
+            # The last second of a video doesn't have a difference so use the one before it
+            first = min(
+                int((clip_start + segment_start) * analysis_fps), len(activity) - 1
+            )
+            last = max(int((clip_start + segment_end) * analysis_fps), first + 1)
+            values = activity[first:last]
+            level = float(values.mean()) if len(values) != 0 else 0
+            weights.append((level + 0.01) ** timelapse_args.variable_speed)
+        for segment, segment_speed in zip(
+            active, fitSpeeds(lengths, weights, sum(lengths) / speed)
+        ):
+            segment[2] = segment_speed
+    return [(x[0], x[1], x[2]) for x in segments]
 
 
 # Function to run FFmpeg
-def runFFmpeg(terms: str) -> None:
+def runFFmpeg(terms: str) -> int:
+    # FFmpeg reads the terminal's input unless it's given none (parallel jobs would take the keystrokes)
     timelapse = subprocess.Popen(
-        terms, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        terms,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
     )
-    # Run the command and wait for it to finish
-    timelapse.wait()
+    # Run the command and wait for it to finish (returning the exit status)
+    return timelapse.wait()
+
+
+# Function to get the x265 parameters (closed GOPs so every keyframe is an IDR frame smart fade can cut at)
+def x265Params(params: List[str]) -> str:
+    return f'-x265-params {":".join(["open-gop=0"] + params)} '
 
 
 # Function to create a timelapse from a video
@@ -601,236 +1587,169 @@ def timelapseVideo(
     cut_from_end: bool,
     fade_in: float,
     fade_out: float,
-) -> None:
-    # Variables for handling the current process
-    current_input = file
-    ## FFmpeg is a little fucky so I think I have to do these in multiple steps
-
-    # Check if the file needs no modification
-    if not (
-        (cut_in != 0 or cut_out != 0)
-        or (speed_factor != 0 and speed_factor != 1)
-        or (fade_in != 0 or fade_out != 0)
-    ):
-        # All we need to do is change the codec and the framerate to match the rest of the videos
-        terms = f'ffmpeg -i "{file}" '
-        # Add the threads
-        if timelapse_args.threads != -1:
-            terms += f"-threads {timelapse_args.threads} "
-        # Add the rest of the terms
-        terms += f'-vf "{resize_vf}" -c:v libx265 -r {timelapse_args.output_fps} '
-        # If we're not preserving the audio
-        if not timelapse_args.preserve_audio:
-            terms += f"-an "
-        # If we are preserving the audio
-        else:
-            terms += f"-c:a mp3 "
-        # Output
-        terms += f'"{final_output}"'
-        # Run ffmpeg
-        runFFmpeg(terms)
-        # We can skip the rest of the function and save a whopping 3 conditionals.
-        return
-
-    # Bool to not delete if getting the source
-    first = True
-
-    # FFmpeg clip the video
-    if cut_in != 0 or cut_out != 0:
-        logger.info(f'Clipping the temp timelapse of "{file}"')
-        start = time.perf_counter()
-        # Get durations
-        cut_duration = getClipTime(current_input, cut_in, cut_out, cut_from_end, False)
-        terms = "ffmpeg "
+    threads: int,
+    source_duration: Union[float, None] = None,
+) -> bool:
+    # The clip, speed, and fade are all done in one filter graph so the clip is only encoded once
+    logger.info(f'Rendering the temp timelapse of "{file}"')
+    start = time.perf_counter()
+    # Bools for what modifications are being done
+    clipping = cut_in != 0 or cut_out != 0
+    speeding = speed_factor != 0 and speed_factor != 1
+    fading = fade_in != 0 or fade_out != 0
+    terms = "ffmpeg "
+    # Get the clipped length (only probe the source if we need the length)
+    if clipping:
+        cut_duration = getClipTime(
+            file, cut_in, cut_out, cut_from_end, False, source_duration
+        )
         # Add the beginning cut
         if cut_duration["cut_in"] != 0:
             terms += f'-ss {cut_duration["cut_in"]} '
-        # Add the input file
-        terms += f'-i "{file}" '
-        # Compare the resolutions
-        match_resolution = checkResolution(file)
-        if not match_resolution:
-            terms += f'-vf "{resize_vf}" '
-        # Add the threads
-        if timelapse_args.threads != -1:
-            terms += f"-threads {timelapse_args.threads} "
-        # Check other possibilities to see what output to use
-        if (fade_in != 0 or fade_out != 0) or (speed_factor != 1 and speed_factor != 0):
-            temp_file = f"{file.stem}c{file.suffix}"
-            output = pathlib.Path.joinpath(timelapse_args.temp_directory, temp_file)
-            # Copy the video codec and remove audio
-            if match_resolution:
-                terms += f"-c:v copy "  # Not sure if copy will still work if resizing will need to test
-            else:
-                terms += f"-c:v libx265 "  # I couldn't copy it anymore ... oh well
-            # If we're not preserving the audio
-            if not timelapse_args.preserve_audio:
-                terms += f"-an "
-            # If we are preserving the audio check the speed factor to speed up audio too
-            #  or else it'll just freeze on the last frame
-            elif speed_factor != 1 and speed_factor != 0:
-                tempo = generateTempo(speed_factor)
-                terms += f'-c:a mp3 -af "{tempo}"'
-            # If not using the speed factor either
-            else:
-                terms += f"-c:a mp3 "
-            # Add the trim
-            if cut_duration["cut_out"] != 0:
-                terms += f'-t {cut_duration["new_duration"]} "{output}"'
-            else:
-                terms += f'"{output}"'
-            # Run ffmpeg (duplicate code to save 2 conditionals :pain:)
-            runFFmpeg(terms)
-            current_input = output
-            end = time.perf_counter()
-            duration = end - start
-            logger.info(
-                f'Successfully clipped the temp timelapse of "{file} after {duration} seconds'
-            )
-            # Set first to false
-            first = False
-        else:
-            # Change the video codec, change the framerate, and remove audio (We need to do this here, but not if
-            # another process is being done. This is because we need to do it at some point, but clipping is really
-            # fast if we don't change the codec or framerate.)
-            terms += f"-c:v libx265 -r {timelapse_args.output_fps} "
-            # If we're not preserving the audio
-            if not timelapse_args.preserve_audio:
-                terms += f"-an "
-            # If we are preserving the audio
-            else:
-                terms += f"-c:a mp3 "
-            output = final_output
-            # Add the trim
-            if cut_duration["cut_out"] != 0:
-                terms += f'-t {cut_duration["new_duration"]} "{output}"'
-            else:
-                terms += f'"{output}"'
-            # Run ffmpeg (duplicate code to save 2 conditionals :pain:)
-            runFFmpeg(terms)
-            current_input = output
-            end = time.perf_counter()
-            duration = end - start
+        # Add the trim (as an input option so it's the length after the beginning cut)
+        if cut_duration["cut_out"] != 0:
+            terms += f'-t {cut_duration["output_length"]} '
+    # Get the parts of the clip if they have different speeds or are idle
+    segments = getClipSegments(
+        file, speed_factor, cut_in, cut_out, cut_from_end, source_duration
+    )
+    # The slowest part decides if only the keyframes can be decoded (variable speed slows the active parts down)
+    slowest_speed = min(
+        [x[2] for x in segments if x[2] is not None], default=speed_factor
+    )
+    # Only decode the keyframes if every output frame is at least a keyframe apart in the source
+    keyframe_only = False
+    if (timelapse_args.fast_speedup or timelapse_args.keyframe_only) and speeding:
+        keyframe_interval = getKeyframeInterval(file)
+        if (
+            keyframe_interval is not None
+            and keyframe_interval <= slowest_speed / timelapse_args.output_fps
+        ):
             logger.info(
-                f'Successfully clipped the temp timelapse of "{file} after {duration} seconds'
+                f'Only decoding the keyframes of "{file}" (every {keyframe_interval} seconds)'
             )
-            return
-
-    # FFmpeg speed up the video
-    if speed_factor != 0 and speed_factor != 1:
-        logger.info(f'Speeding up the temp timelapse of "{file}"')
-        start = time.perf_counter()
-        terms = "ffmpeg "
-        # Add the input file and speed up factor
-        terms += f'-i "{current_input}" '
-        # Add the threads
-        if timelapse_args.threads != -1:
-            terms += f"-threads {timelapse_args.threads} "
-        # Add the rest of the terms
-        terms += f'-vf "{resize_vf},setpts={1/speed_factor}*PTS" '
-        # Check other possibilities to see what output to use
-        if fade_in != 0 or fade_out != 0:
-            temp_file = f"{file.stem}s{file.suffix}"
-            output = pathlib.Path.joinpath(timelapse_args.temp_directory, temp_file)
-            # Remove audio (have to add the codec or it doesn't work, copying it doesn't work)
-            terms += f"-c:v libx265 "
-            # If we're not preserving the audio
-            if not timelapse_args.preserve_audio:
-                terms += f"-an "
-            # If we are preserving the audio
-            else:
-                terms += f"-c:a mp3 "
-            # Output
-            terms += f'"{output}"'
-            # Run ffmpeg (duplicate code to save a conditional :pain:)
-            runFFmpeg(terms)
-            # Remove if not getting from source (getting from temporary)
-            if not first:
-                os.remove(current_input)
-            else:
-                first = False
-            current_input = output
-            end = time.perf_counter()
-            duration = end - start
+            terms += f"-skip_frame nokey "
+        # If always decoding only the keyframes the frames are repeated to fill the output
+        elif timelapse_args.keyframe_only:
+            keyframe_only = True
+            # If the keyframe interval isn't known assume there's one per output frame
+            if keyframe_interval is None:
+                keyframe_interval = slowest_speed / timelapse_args.output_fps
             logger.info(
-                f'Successfully sped the temp timelapse of "{file} after {duration} seconds'
+                f'Only decoding the keyframes of "{file}", each is repeated for up to {keyframe_interval * timelapse_args.output_fps / slowest_speed} frames (an effective speed of {keyframe_interval * timelapse_args.output_fps}x per unique frame)'
             )
-        else:
-            output = final_output
-            # Remove audio (have to add the codec or it doesn't work, copying it doesn't work)
-            terms += f"-c:v libx265 -r {timelapse_args.output_fps} "
-            # If we're not preserving the audio
-            if not timelapse_args.preserve_audio:
-                terms += f"-an "
-            # If we are preserving the audio
-            else:
-                terms += f"-c:a mp3 "
-            # Output
-            terms += f'"{output}"'
-            # Run ffmpeg (duplicate code to save a conditional :pain:)
-            runFFmpeg(terms)
-            # Remove if not getting from source (getting from temporary)
-            if not first:
-                os.remove(current_input)
-            current_input = output
-            end = time.perf_counter()
-            duration = end - start
-            logger.info(
-                f'Successfully sped the temp timelapse of "{file} after {duration} seconds'
+            terms += f"-skip_frame nokey "
+    # Add the input file
+    terms += f"{inputTerms(file)} "
+    # Add the threads
+    if threads != -1:
+        terms += f"-threads {threads} "
+    # Create the video filter chain
+    video_filters = []
+    # Skip the idle parts and move every other part to its place in the output at its speed
+    if len(segments) != 0:
+        idle_ranges = [x for x in segments if x[2] is None]
+        active = [x for x in segments if x[2] is not None]
+        logger.info(
+            f'Skipping {sum(x[1] - x[0] for x in idle_ranges)} idle seconds of "{file}" and speeding up the rest {min(x[2] for x in active)}x to {max(x[2] for x in active)}x'
+        )
+        if len(idle_ranges) != 0:
+            skipped = "+".join(f"between(t,{x[0]},{x[1]})" for x in idle_ranges)
+            video_filters.append(f"select='not({skipped})'")
+        # The output time of every frame from the part it's in
+        parts = []
+        output_start = 0
+        for index, (segment_start, segment_end, segment_speed) in enumerate(active):
+            condition = f"gte(T,{segment_start})"
+            if index != len(active) - 1:
+                condition += f"*lt(T,{segment_end})"
+            parts.append(
+                f"{condition}*({output_start}+(T-{segment_start})/{segment_speed})"
             )
-            return
-
-    # FFmpeg fade the video
-    if fade_in != 0 or fade_out != 0:
-        logger.info(f'Fading the temp timelapse of "{file}"')
-        start = time.perf_counter()
-        # Get durations
-        fade_duration = getFadeTime(current_input, fade_in, fade_out)
-        terms = f'ffmpeg -i "{current_input}" '
-        # Add the threads
-        if timelapse_args.threads != -1:
-            terms += f"-threads {timelapse_args.threads} "
-        # Add the fades
-        terms += f'-vf "{resize_vf},'
+            output_start += (segment_end - segment_start) / segment_speed
+        video_filters.append(f"setpts='({'+'.join(parts)})/TB'")
+    # Add the speed up
+    elif speeding:
+        video_filters.append(f"setpts={1/speed_factor}*PTS")
+    # Drop the frames that aren't in the output before the resize so they aren't scaled
+    video_filters.append(f"fps={timelapse_args.output_fps}")
+    # Repeat the last keyframe until the end of the clip (the fps filter repeats the rest)
+    if keyframe_only:
+        video_filters.append(
+            f"tpad=stop_mode=clone:stop_duration={keyframe_interval / slowest_speed}"
+        )
+    # Add the resize
+    video_filters.append(resize_vf)
+    # Add the fades (timed from the planned output length instead of probing an intermediate file)
+    if fading:
+        planned_duration = planClipLength(
+            file, speed_factor, cut_in, cut_out, cut_from_end, source_duration
+        )
+        fade_duration = calcFadeTime(file, planned_duration, fade_in, fade_out)
         # Add the fade in if there is one
         if fade_duration["fade_in_l"] != 0:
-            terms += f'fade=t=in:st=0:d={fade_duration["fade_in_l"]},'
+            video_filters.append(f'fade=t=in:st=0:d={fade_duration["fade_in_l"]}')
         # Add the fade out if there is one
         if fade_duration["fade_out_l"] != 0:
-            terms += f'fade=t=out:st={fade_duration["fade_out_s"]}:d={fade_duration["fade_out_l"]}"'
-        # If there isn't a fade out replace the comma with a double quote
-        else:
-            terms = terms[:-1]
-            terms += f'"'
-        # Copy the video codec and remove audio.
-        terms += f" -c:v libx265 -r {timelapse_args.output_fps} "
-        # If we're not preserving the audio
-        if not timelapse_args.preserve_audio:
-            terms += f"-an "
-        # If we are preserving the audio
-        else:
-            terms += f"-c:a mp3 "
-        # Output
-        terms += f'"{final_output}"'
-        # Run ffmpeg
-        runFFmpeg(terms)
-        # Remove if not getting from source (getting from temporary)
-        if not first:
-            os.remove(current_input)
-        end = time.perf_counter()
-        duration = end - start
-        logger.info(
-            f'Successfully faded the temp timelapse of "{file} after {duration} seconds'
-        )
-        return  # It would return after this either way, but whatever
+            video_filters.append(
+                f'fade=t=out:st={fade_duration["fade_out_s"]}:d={fade_duration["fade_out_l"]}'
+            )
+    # The filters of a clip with many parts are too long for the command so they're read from a file
+    filter_script = pathlib.Path.joinpath(
+        timelapse_args.temp_directory, f"{final_output.stem}_filters.txt"
+    )
+    if len(segments) != 0:
+        with open(filter_script, "w+") as script_file:
+            script_file.write(",".join(video_filters))
+        terms += f'-filter_script:v "{filter_script}" '
+    else:
+        terms += f'-vf "{",".join(video_filters)}" '
+    # Change the video codec and the framerate to match the rest of the videos
+    terms += f"-c:v libx265 -r {timelapse_args.output_fps} "
+    # Cut the repeated keyframe at the length the clip would have with every frame
+    if keyframe_only:
+        terms += f"-t {planClipLength(file, speed_factor, cut_in, cut_out, cut_from_end, source_duration)} "
+    # Limit the x265 thread pool to the threads given to this clip
+    x265_params = []
+    if threads > 0:
+        x265_params.append(f"pools={threads}")
+    terms += x265Params(x265_params)
+    # If we're not preserving the audio
+    if not timelapse_args.preserve_audio:
+        terms += f"-an "
+    # If we are preserving the audio speed it up too or else it'll just freeze on the last frame
+    elif speeding:
+        tempo = generateTempo(speed_factor)
+        terms += f'-af "{tempo}" -c:a mp3 '
+    # If not using the speed factor either
+    else:
+        terms += f"-c:a mp3 "
+    # Output
+    terms += f'"{final_output}"'
+    # Run ffmpeg
+    return_code = runFFmpeg(terms)
+    # Remove the filter script
+    if len(segments) != 0:
+        os.remove(filter_script)
+    end = time.perf_counter()
+    duration = end - start
+    if return_code != 0:
+        logger.warning(f'FFmpeg failed to render the temp timelapse of "{file}"')
+        return False
+    logger.info(
+        f'Successfully rendered the temp timelapse of "{file}" after {duration} seconds'
+    )
+    return True
 
 
 # Function to create the timelapse and the log info
-def logTimelapses(video: pathlib.Path, output: pathlib.Path, index: int) -> None:
+def logTimelapses(
+    video: pathlib.Path, output: pathlib.Path, index: int, threads: int, key: str
+) -> None:
     # Create the new timelapse
     logger.info(f'Creating new timelapse of "{video}" at "{output}"')
     start = time.perf_counter()
-    timelapseVideo(
+    success = timelapseVideo(
         video,
         output,
         user_answers[video][index]["speed_factor"],
@@ -839,7 +1758,10 @@ def logTimelapses(video: pathlib.Path, output: pathlib.Path, index: int) -> None
         user_answers[video][index]["clip_from_end"],
         user_answers[video][index]["fade_in"],
         user_answers[video][index]["fade_out"],
+        threads,
     )
+    # Record what the timelapse was rendered from
+    recordRender(output, key, success)
     end = time.perf_counter()
     duration = end - start
     logger.info(
@@ -863,8 +1785,110 @@ def delLog(file: pathlib.Path, notice1: str, notice2: str) -> None:
         logger.warning(f'Couldn\'t delete at "{file}"')
 
 
+# Function to get the render key of a clip (it changes when anything that changes the output changes)
+def renderKey(file: pathlib.Path, settings: dict, file_type: str) -> str:
+    # The identity of the source file (of all its frames if it's an image sequence)
+    path, size, mtime_ns = fileIdentity(file)
+    key_data = {
+        "source": path,
+        "size": size,
+        "mtime_ns": mtime_ns,
+        "file_type": file_type,
+        "settings": settings,
+    }
+    # The framerate of an image sequence changes its timeline
+    if file.is_dir():
+        key_data["sequence_fps"] = timelapse_args.sequence_fps
+    # The encoder settings
+    if file_type == "audio":
+        key_data["encoder"] = {"audio_codec": "mp3"}
+    else:
+        key_data["encoder"] = {
+            "video_codec": "libx265",
+            "open_gop": False,
+            "output_fps": timelapse_args.output_fps,
+            "width": timelapse_args.width,
+            "height": timelapse_args.height,
+            "resize_vf": resize_vf,
+            "fast_speedup": timelapse_args.fast_speedup,
+            "keyframe_only": timelapse_args.keyframe_only,
+            "skip_idle": timelapse_args.skip_idle,
+            "min_idle_length": timelapse_args.min_idle_length,
+            "variable_speed": timelapse_args.variable_speed,
+            "dedup": timelapse_args.dedup,
+            "preserve_audio": timelapse_args.preserve_audio,
+        }
+    json_dump = json.dumps(key_data, sort_keys=True)
+    return hashlib.sha256(json_dump.encode()).hexdigest()
+
+
+# Function to check if a temp file needs to be rendered (deleting the existing file if it does)
+def needsRender(
+    output: pathlib.Path, key: str, override: bool, notice1: str, notice2: str
+) -> bool:
+    # If the file doesn't exist just create it
+    if not checkPath(output):
+        render_cache.set(output, pending_key)
+        return True
+    # Delete the existing file if that setting is enabled
+    if override:
+        delLog(output, notice1, notice2)
+        render_cache.set(output, pending_key)
+        return True
+    # Check what the existing file was rendered from
+    cached_key = render_cache.get(output)
+    # If it wasn't rendered by this program keep it
+    if cached_key is None:
+        return False
+    # If it was rendered from the same source and settings reuse it
+    if cached_key == key:
+        logger.info(f'Reusing the unchanged temp file "{output}"')
+        return False
+    # If a run was stopped while rendering it it's incomplete
+    if cached_key == pending_key:
+        logger.info(f'The temp file "{output}" wasn\'t finished')
+    # If the source or settings changed render it again
+    else:
+        logger.info(f'The source or settings of "{output}" changed')
+    delLog(output, notice1, notice2)
+    render_cache.set(output, pending_key)
+    return True
+
+
+# Function to record what a temp file was rendered from (deleting it if FFmpeg failed so it's rendered again)
+def recordRender(output: pathlib.Path, key: str, success: bool) -> None:
+    if success:
+        render_cache.set(output, key)
+        return
+    logger.warning(f'Couldn\'t render "{output}", it will be rendered again next run')
+    if checkPath(output):
+        delLog(output, "Deleting the failed temp file", "Deleted the failed temp file")
+
+
+# Function to split the CPU cores between the concurrent render jobs (only as many jobs as there are queued clips)
+def getJobThreads(queued: int) -> Tuple[int, int]:
+    # Get the amount of cores on the machine
+    cores = os.cpu_count()
+    if cores is None:
+        cores = 1
+    # Get the amount of jobs (0 gives each job about 8 cores, where x265 stops getting much faster)
+    if timelapse_args.jobs == 0:
+        jobs = max(1, cores // 8)
+    else:
+        jobs = timelapse_args.jobs
+    # Don't leave cores for jobs that won't run
+    jobs = max(1, min(jobs, queued))
+    # If only running 1 job use the normal thread setting
+    if jobs == 1:
+        return (1, timelapse_args.threads)
+    # Split the cores between the jobs
+    return (jobs, max(1, cores // jobs))
+
+
 # Function to create multiple timelapses
 def createTimelapses(video_files: list):
+    # List of the clips that need to be rendered
+    render_jobs = []
     # Turn every video into a timelapse
     for video in video_files:
         video_settings = user_answers[video]
@@ -872,51 +1896,272 @@ def createTimelapses(video_files: list):
         # for index, clips in enumerate(video_settings):
         for index in range(len(video_settings)):
             # Creating the new output
-            output = pathlib.Path.joinpath(
-                timelapse_args.temp_directory, f"{video.stem}_{index}{video.suffix}"
+            if video.is_dir():
+                output = pathlib.Path.joinpath(
+                    timelapse_args.temp_directory, f"{video.name}_sequence_{index}.mp4"
+                )
+            else:
+                output = pathlib.Path.joinpath(
+                    timelapse_args.temp_directory, f"{video.stem}_{index}{video.suffix}"
+                )
+            # Check if the timelapse needs to be created
+            key = renderKey(video, video_settings[index], "video")
+            if needsRender(
+                output,
+                key,
+                timelapse_args.override_temp_video,
+                "Deleting existing temp video",
+                "Deleted existing temp video",
+            ):
+                # Create the new timelapse
+                render_jobs.append((video, output, index, key))
+    # Get the amount of concurrent jobs and the threads each one gets
+    jobs, threads = getJobThreads(len(render_jobs))
+    # Render the clips
+    if jobs == 1:
+        for video, output, index, key in render_jobs:
+            logTimelapses(video, output, index, threads, key)
+    else:
+        logger.info(
+            f"Rendering {len(render_jobs)} clips with {jobs} jobs using {threads} threads each"
+        )
+        with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as executor:
+            futures = [
+                executor.submit(logTimelapses, video, output, index, threads, key)
+                for video, output, index, key in render_jobs
+            ]
+            # Wait for all the clips (and raise any errors)
+            for future in futures:
+                future.result()
+    # Delete the frame lists of the image sequences
+    for video in video_files:
+        concat_sequence = pathlib.Path.joinpath(
+            timelapse_args.temp_directory, f"{video.name}_sequence_frames.txt"
+        )
+        if video.is_dir() and checkPath(concat_sequence):
+            delLog(
+                concat_sequence,
+                "Deleting the image sequence concat file at",
+                "Deleted the image sequence concat file at",
             )
-            # Check if a timelapse already exists
-            if checkPath(output):
-                # Delete the existing file if that setting is enabled
-                if timelapse_args.override_temp_video:
+    # Delete the source video files if that setting is enabled
+    if timelapse_args.delete_video:
+        for video in video_files:
+            # Delete the frames of an image sequence before its directory
+            if video.is_dir():
+                for frame in getSequenceFrames(video):
                     delLog(
-                        output,
-                        "Deleting existing temp video",
-                        "Deleted existing temp video",
+                        frame,
+                        "Deleting existing source frame",
+                        "Deleted existing source frame",
                     )
-                    # Create the new timelapse
-                    logTimelapses(video, output, index)
-            # If the file doesn't exist just create it
-            else:
-                # Create the new timelapse
-                logTimelapses(video, output, index)
-        # Delete the source video file if that setting is enabled
-        if timelapse_args.delete_video:
             delLog(
-                video, "Deleting existing source video", "Deleted existing source video"
+                video,
+                "Deleting existing source video",
+                "Deleted existing source video",
             )
 
 
+# Function to get the fade filters from the fade times
+def fadeFilters(fade_duration: dict, filter_name: str) -> List[str]:
+    filters = []
+    # Add the fade in if there is one
+    if fade_duration["fade_in_l"] != 0:
+        filters.append(f'{filter_name}=t=in:st=0:d={fade_duration["fade_in_l"]}')
+    # Add the fade out if there is one
+    if fade_duration["fade_out_l"] != 0:
+        filters.append(
+            f'{filter_name}=t=out:st={fade_duration["fade_out_s"]}:d={fade_duration["fade_out_l"]}'
+        )
+    return filters
+
+
 # Function to combine the timelapse videos
-def combineTimelapse(concat_file: pathlib.Path, output_file: pathlib.Path) -> None:
-    # Check if using a fade on the output
+def combineTimelapse(
+    files: List[pathlib.Path], concat_file: pathlib.Path, output_file: pathlib.Path
+) -> None:
+    # If there won't be a timelapse with audio the modified output is made with this one
+    modify = not checkAddingAudio() and checkModifiedOutput()
+    audio_map = "0:a?" if timelapse_args.preserve_audio else None
+    # If not using a fade just output it
     if (
-        timelapse_args.output_video_fade_in != 0
-        or timelapse_args.output_video_fade_out != 0
+        timelapse_args.output_video_fade_in == 0
+        and timelapse_args.output_video_fade_out == 0
     ):
-        # Temporary path
-        temp_out = pathlib.Path.joinpath(
-            timelapse_args.output_directory, "timelapse_plain.mp4"
+        modified_terms = ""
+        if modify:
+            modified_terms = modifiedOutputTerms(
+                output_file, "0:v", [resize_vf], audio_map, []
+            )
+        # Merge the timelapse files
+        concatVideo(files, concat_file, output_file, modified_terms)
+        return
+    # Path of the unfaded output
+    temp_out = pathlib.Path.joinpath(
+        timelapse_args.output_directory, "timelapse_plain.mp4"
+    )
+    planned_lengths[temp_out] = getPlannedLength(output_file)
+    # Get durations
+    fade_duration = getFadeTime(
+        output_file,
+        timelapse_args.output_video_fade_in,
+        timelapse_args.output_video_fade_out,
+    )
+    # The modified output is faded like the output before it's modified
+    modified_terms = ""
+    if modify:
+        modified_terms = modifiedOutputTerms(
+            output_file,
+            "0:v",
+            [resize_vf] + fadeFilters(fade_duration, "fade"),
+            audio_map,
+            [],
         )
+    # Smart fading needs the unfaded output to find the keyframes
+    # (the audio would need to be split too so it isn't used with audio)
+    # The clips have to have been rendered by this program so their keyframes are IDR frames that can be cut at
+    if (
+        timelapse_args.smart_fade
+        and not timelapse_args.preserve_audio
+        and checkClosedGop(files)
+    ):
         logger.info(f'Creating the unfaded output timelapse "{temp_out}"')
         start = time.perf_counter()
         # Create the combined timelapse
-        terms = f'ffmpeg -f concat -safe 0 -i "{concat_file}" '
+        concatVideo(files, concat_file, temp_out, modified_terms)
+        modified_terms = ""
+        end = time.perf_counter()
+        duration = end - start
+        logger.info(
+            f'Created the unfaded output timelapse "{temp_out}" after {duration} seconds'
+        )
+        # Only encode the start and end
+        logger.info(f'Fading the output timelapse "{output_file}"')
+        start = time.perf_counter()
+        if smartFade(temp_out, output_file, fade_duration):
+            # Remove if not keeping the unfaded output
+            if not timelapse_args.keep_unfaded_video:
+                os.remove(temp_out)
+            end = time.perf_counter()
+            duration = end - start
+            logger.info(
+                f'Successfully faded the output timelapse "{output_file}" after {duration} seconds'
+            )
+            return
+        # If it couldn't be smart faded encode it normally (without the unfaded output)
+        os.remove(temp_out)
+    logger.info(f'Creating the faded output timelapse "{output_file}"')
+    start = time.perf_counter()
+    # Create the combined timelapse (decoding the temp videos once for both outputs)
+    terms = f'ffmpeg -f concat -safe 0 -i "{concat_file}" '
+    # Add the threads
+    if timelapse_args.threads != -1:
+        terms += f"-threads {timelapse_args.threads} "
+    # The faded video filters
+    video_filters = ",".join([resize_vf] + fadeFilters(fade_duration, "fade"))
+    # If keeping the unfaded output
+    if timelapse_args.keep_unfaded_video:
+        # If the temp videos can be copied the unfaded output just copies them
+        if checkConcatCopy(files):
+            terms += f'-filter_complex "[0:v]{video_filters}[faded]" '
+            terms += f"-map 0:v -c:v copy "
+            # If we're preserving the audio
+            if timelapse_args.preserve_audio:
+                terms += f"-map 0:a? -c:a copy "
+            terms += f'"{temp_out}" '
+        # If not split the decoded video between both outputs
+        else:
+            terms += f'-filter_complex "[0:v]split=2[plain][fade];[fade]{video_filters}[faded];[plain]{resize_vf}[plain_out]" '
+            terms += f'-map "[plain_out]" -c:v libx265 -r {timelapse_args.output_fps} '
+            # If we're preserving the audio
+            if timelapse_args.preserve_audio:
+                terms += f"-map 0:a? -c:a mp3 "
+            terms += f'"{temp_out}" '
+    # If not just create the faded output
+    else:
+        terms += f'-filter_complex "[0:v]{video_filters}[faded]" '
+    # Add the faded output
+    terms += f'-map "[faded]" -c:v libx265 -r {timelapse_args.output_fps} '
+    # If we're preserving the audio
+    if timelapse_args.preserve_audio:
+        terms += f"-map 0:a? -c:a mp3 "
+    # Output
+    terms += f'"{output_file}"'
+    # Add the modified output
+    if modified_terms != "":
+        terms += f" {modified_terms}"
+    # Run ffmpeg
+    runFFmpeg(terms)
+    end = time.perf_counter()
+    duration = end - start
+    logger.info(
+        f'Successfully faded the output timelapse "{output_file}" after {duration} seconds'
+    )
+
+
+# Function to get the codec parameters that have to match to concat files without encoding
+def getStreamParameters(file: pathlib.Path) -> dict:
+    metadata = probeFile(file)
+    resolution = metadata["resolution"]
+    if resolution is not None:
+        resolution = (resolution[0], resolution[1])
+    return {
+        "codec": metadata["codec"],
+        "profile": metadata["profile"],
+        "resolution": resolution,
+        "pix_fmt": metadata["pix_fmt"],
+        "time_base": metadata["time_base"],
+        "framerate": metadata["framerate"],
+        "audio_codec": metadata["audio_codec"],
+    }
+
+
+# Function to check if the parameters are what the temp videos are encoded to
+def checkTargetParameters(parameters: dict) -> bool:
+    if (
+        parameters["codec"] != "hevc"
+        or parameters["resolution"] != (timelapse_args.width, timelapse_args.height)
+        or parameters["framerate"] != round(timelapse_args.output_fps, 2)
+    ):
+        return False
+    # The audio has to match too if it's being kept
+    if timelapse_args.preserve_audio and parameters["audio_codec"] != "mp3":
+        return False
+    return True
+
+
+# Function to check if the temp videos can be concatenated without encoding any of them
+def checkConcatCopy(files: List[pathlib.Path]) -> bool:
+    parameters = [getStreamParameters(file) for file in files]
+    if len(parameters) == 0 or not checkTargetParameters(parameters[0]):
+        return False
+    return all(parameter == parameters[0] for parameter in parameters)
+
+
+# Function to concat the timelapse videos (copying the streams when they all match)
+def concatVideo(
+    files: List[pathlib.Path],
+    concat_file: pathlib.Path,
+    output_file: pathlib.Path,
+    modified_terms: str = "",
+) -> None:
+    # Get the parameters of every video
+    parameters = [getStreamParameters(file) for file in files]
+    # Use the most common parameters that match the output settings as the target
+    counts = collections.Counter(
+        json.dumps(parameter, sort_keys=True)
+        for parameter in parameters
+        if checkTargetParameters(parameter)
+    )
+    # If none of the videos match encode the whole timeline
+    if len(counts) == 0:
+        logger.info(f"The temp videos don't match the output settings, encoding them")
+        terms = f'ffmpeg -f concat -safe 0 -i "{concat_file}" -vf "{resize_vf}" '
         # Add the threads
         if timelapse_args.threads != -1:
             terms += f"-threads {timelapse_args.threads} "
         # Add the rest of the terms
-        terms += f"-c:v libx265 -r {timelapse_args.output_fps} "
+        terms += f"-c:v libx265 -r {timelapse_args.output_fps} {x265Params([])}"
         # If we're not preserving the audio
         if not timelapse_args.preserve_audio:
             terms += f"-an "
@@ -924,40 +2169,37 @@ def combineTimelapse(concat_file: pathlib.Path, output_file: pathlib.Path) -> No
         else:
             terms += f"-c:a mp3 "
         # Output
-        terms += f'"{temp_out}"'
+        terms += f'"{output_file}"'
+        # Add the modified output
+        if modified_terms != "":
+            terms += f" {modified_terms}"
         runFFmpeg(terms)
-        end = time.perf_counter()
-        duration = end - start
-        logger.info(
-            f'Created the unfaded output timelapse "{temp_out}" after {duration} seconds'
-        )
-        # Create the fade
-        logger.info(f'Fading the output timelapse "{output_file}"')
-        start = time.perf_counter()
-        # Get durations
-        fade_duration = getFadeTime(
-            temp_out,
-            timelapse_args.output_video_fade_in,
-            timelapse_args.output_video_fade_out,
+        return
+    target = json.loads(counts.most_common(1)[0][0])
+    target["resolution"] = tuple(target["resolution"])
+    # Encode only the videos that don't match the target
+    concat_files = []
+    conformed_files = []
+    for file, parameter in zip(files, parameters):
+        if parameter == target:
+            concat_files.append(file)
+            continue
+        conformed = pathlib.Path.joinpath(
+            timelapse_args.temp_directory, f"{file.stem}_conform.mp4"
         )
-        terms = f'ffmpeg -i "{temp_out}" '
+        logger.info(f'Encoding "{file}" to match the other temp videos')
+        terms = f'ffmpeg -i "{file}" '
         # Add the threads
         if timelapse_args.threads != -1:
             terms += f"-threads {timelapse_args.threads} "
-        # Add the fades
-        terms += f'-vf "{resize_vf},'
-        # Add the fade in if there is one
-        if fade_duration["fade_in_l"] != 0:
-            terms += f'fade=t=in:st=0:d={fade_duration["fade_in_l"]},'
-        # Add the fade out if there is one
-        if fade_duration["fade_out_l"] != 0:
-            terms += f'fade=t=out:st={fade_duration["fade_out_s"]}:d={fade_duration["fade_out_l"]}"'
-        # If there isn't a fade out replace the comma with a double quote
-        else:
-            terms = terms[:-1]
-            terms += f'"'
-        # Copy the video codec and remove audio.
-        terms += f" -c:v libx265 -r {timelapse_args.output_fps} "
+        # Add the rest of the terms
+        terms += f'-vf "{resize_vf}" -c:v libx265 -r {timelapse_args.output_fps} '
+        terms += x265Params([])
+        if target["pix_fmt"] is not None:
+            terms += f'-pix_fmt {target["pix_fmt"]} '
+        # Match the timescale so the timestamps line up
+        if target["time_base"] is not None:
+            terms += f'-video_track_timescale {target["time_base"].split("/")[1]} '
         # If we're not preserving the audio
         if not timelapse_args.preserve_audio:
             terms += f"-an "
@@ -965,42 +2207,206 @@ def combineTimelapse(concat_file: pathlib.Path, output_file: pathlib.Path) -> No
         else:
             terms += f"-c:a mp3 "
         # Output
-        terms += f'"{output_file}"'
-        # Run ffmpeg
+        terms += f'"{conformed}"'
         runFFmpeg(terms)
-        # Remove if not getting from source (getting from temporary)
-        if not timelapse_args.keep_unfaded_video:
-            os.remove(temp_out)
-        end = time.perf_counter()
-        duration = end - start
-        logger.info(
-            f'Successfully faded the output timelapse "{output_file}" after {duration} seconds'
+        concat_files.append(conformed)
+        conformed_files.append(conformed)
+    # Write the concat file with the encoded videos
+    if len(conformed_files) != 0:
+        concat_file = pathlib.Path.joinpath(
+            timelapse_args.temp_directory, "video_conform.txt"
+        )
+        writeConcat(concat_files, concat_file)
+    # Copy the streams
+    logger.info(f'Copying the temp videos into "{output_file}"')
+    terms = f'ffmpeg -f concat -safe 0 -i "{concat_file}" -c copy '
+    # If we're not preserving the audio
+    if not timelapse_args.preserve_audio:
+        terms += f"-an "
+    # Output
+    terms += f'"{output_file}"'
+    # Add the modified output
+    if modified_terms != "":
+        terms += f" {modified_terms}"
+    runFFmpeg(terms)
+    # Delete the encoded videos
+    for file in conformed_files:
+        delLog(
+            file,
+            "Deleting the encoded temp video at",
+            "Deleted the encoded temp video at",
+        )
+    if len(conformed_files) != 0:
+        delLog(
+            concat_file,
+            "Deleting the video concat file at",
+            "Deleted the video concat file at",
+        )
+
+
+# Function to check if the clips were all rendered with closed GOPs (so smart fade can cut them at any keyframe)
+def checkClosedGop(files: List[pathlib.Path]) -> bool:
+    for file in files:
+        if render_cache.get(file) in [None, pending_key]:
+            logger.info(
+                f'"{file}" wasn\'t rendered by this program so it might have open GOPs, encoding the whole faded output'
+            )
+            return False
+    return True
+
+
+# Function to get the keyframe times of a video (only reading the given intervals)
+def getKeyframes(file: pathlib.Path, read_intervals: str) -> List[float]:
+    terms = f'ffprobe -v error -of json -select_streams v:0 -read_intervals "{read_intervals}" -show_entries packet=pts_time,flags "{file}"'
+    ffprobe = subprocess.Popen(
+        terms, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+    )
+    # Run the command and get the result
+    result, err = ffprobe.communicate()
+    data = json.loads(result)
+    keyframes = set()
+    for packet in data.get("packets", []):
+        if "K" in packet.get("flags", "") and "pts_time" in packet:
+            keyframes.add(float(packet["pts_time"]))
+    return sorted(keyframes)
+
+
+# Function to fade a video by only encoding the GOPs that overlap the fades (returns False if it can't)
+def smartFade(
+    input_file: pathlib.Path, output_file: pathlib.Path, fade_duration: dict
+) -> bool:
+    duration = getPlannedLength(input_file)
+    # Only read the packets around the fades (the keyframes are at most a few seconds apart)
+    margin = 30
+    keyframes = getKeyframes(
+        input_file,
+        f'%+{fade_duration["fade_in_l"] + margin},{max(0, fade_duration["fade_out_s"] - margin)}%',
+    )
+    # The end of the fade in is the first keyframe after it
+    head_end = 0
+    if fade_duration["fade_in_l"] != 0:
+        after_fade = [x for x in keyframes if x >= fade_duration["fade_in_l"]]
+        if len(after_fade) == 0:
+            return False
+        head_end = after_fade[0]
+    # The start of the fade out is the last keyframe before it
+    tail_start = duration
+    if fade_duration["fade_out_l"] != 0:
+        before_fade = [x for x in keyframes if x <= fade_duration["fade_out_s"]]
+        if len(before_fade) == 0:
+            return False
+        tail_start = before_fade[-1]
+    # If the fades overlap the same GOPs there's nothing to copy
+    if head_end >= tail_start:
+        return False
+    logger.info(
+        f'Encoding "{output_file}" from 0 to {head_end} and {tail_start} to {duration} seconds and copying the rest'
+    )
+    parameters = getStreamParameters(input_file)
+    # Terms to encode the parts to match the copied part
+    encode_terms = ""
+    if timelapse_args.threads != -1:
+        encode_terms += f"-threads {timelapse_args.threads} "
+    encode_terms += f"-c:v libx265 -r {timelapse_args.output_fps} "
+    if parameters["pix_fmt"] is not None:
+        encode_terms += f'-pix_fmt {parameters["pix_fmt"]} '
+    if parameters["time_base"] is not None:
+        encode_terms += (
+            f'-video_track_timescale {parameters["time_base"].split("/")[1]} '
+        )
+    encode_terms += "-an "
+    # Paths of the parts
+    head = pathlib.Path.joinpath(timelapse_args.temp_directory, "smart_fade_head.mp4")
+    middle = pathlib.Path.joinpath(
+        timelapse_args.temp_directory, "smart_fade_middle.mp4"
+    )
+    tail = pathlib.Path.joinpath(timelapse_args.temp_directory, "smart_fade_tail.mp4")
+    concat_parts = pathlib.Path.joinpath(
+        timelapse_args.temp_directory, "smart_fade.txt"
+    )
+    # The probed keyframe times are rounded so every cut is half a frame away from them
+    half_frame = 0.5 / timelapse_args.output_fps
+    steps = []
+    # Encode the fade in (up to the frame before the keyframe)
+    if head_end != 0:
+        terms = f'ffmpeg -i "{input_file}" -t {head_end - half_frame} '
+        terms += f'-vf "fade=t=in:st=0:d={fade_duration["fade_in_l"]}" '
+        terms += f'{encode_terms}"{head}"'
+        steps.append((terms, head))
+    # Copy the middle (seeking past the keyframe starts the copy on it, and it ends on the frame before the tail's keyframe)
+    terms = f"ffmpeg -ss {head_end + half_frame} -i \"{input_file}\" -t {tail_start - head_end - 2 * half_frame} "
+    terms += f'-c copy -an "{middle}"'
+    steps.append((terms, middle))
+    # Encode the fade out (starting on the keyframe)
+    if tail_start != duration:
+        terms = f'ffmpeg -ss {tail_start - half_frame} -i "{input_file}" '
+        terms += f'-vf "fade=t=out:st={fade_duration["fade_out_s"] - tail_start + half_frame}:d={fade_duration["fade_out_l"]}" '
+        terms += f'{encode_terms}"{tail}"'
+        steps.append((terms, tail))
+    parts = [part for terms, part in steps]
+    # Join the parts
+    steps.append((None, output_file))
+    success = True
+    for terms, part in steps:
+        if terms is None:
+            writeConcat(parts, concat_parts)
+            terms = f'ffmpeg -f concat -safe 0 -i "{concat_parts}" -c copy "{output_file}"'
+        if runFFmpeg(terms) != 0:
+            logger.warning(f'Couldn\'t create the smart fade part "{part}"')
+            success = False
+            break
+    # Check that the cuts didn't drop or repeat any frames
+    if success:
+        input_length = probeDuration(input_file)
+        output_length = probeDuration(output_file)
+        if (
+            input_length is None
+            or output_length is None
+            or abs(input_length - output_length) > 2 / timelapse_args.output_fps
+        ):
+            logger.warning(
+                f'The smart faded "{output_file}" is {output_length} seconds instead of {input_length}'
+            )
+            success = False
+    # Delete the parts (and the output if it failed so it's encoded normally)
+    for file in parts + [concat_parts]:
+        if checkPath(file):
+            delLog(
+                file,
+                "Deleting the smart fade part at",
+                "Deleted the smart fade part at",
+            )
+    if not success and checkPath(output_file):
+        delLog(
+            output_file,
+            "Deleting the failed smart fade output at",
+            "Deleted the failed smart fade output at",
         )
-    # If not using a fade just output it
-    else:
-        # Merge the timelapse files
-        terms = f'ffmpeg -f concat -safe 0 -i "{concat_file}" -vf "{resize_vf}" '
-        # Add the threads
-        if timelapse_args.threads != -1:
-            terms += f"-threads {timelapse_args.threads} "
-        # Add the rest of the terms
-        terms += f"-c:v libx265 -r {timelapse_args.output_fps} "
-        # If we're not preserving the audio
-        if not timelapse_args.preserve_audio:
-            terms += f"-an "
-        # If we are preserving the audio
-        else:
-            terms += f"-c:a mp3 "
-        # Output
-        terms += f'"{output_file}"'
-        runFFmpeg(terms)
+    return success
+
+
+# Function to get the duration of a file that's being created (it isn't cached like probeFile)
+def probeDuration(file: pathlib.Path) -> Union[float, None]:
+    terms = f'ffprobe -v error -of json -show_entries format=duration "{file}"'
+    ffprobe = subprocess.Popen(
+        terms, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+    )
+    result, err = ffprobe.communicate()
+    try:
+        return float(json.loads(result)["format"]["duration"])
+    except:
+        return None
 
 
 # Function to create the combined timelapse and log
-def logCombineTimelapse(concat_file: pathlib.Path, output_file: pathlib.Path) -> None:
+def logCombineTimelapse(
+    files: List[pathlib.Path], concat_file: pathlib.Path, output_file: pathlib.Path
+) -> None:
+    # Plan the length of the output from the clips
+    planned_lengths[output_file] = planCombinedLength(video_order)
     logger.info(f'Creating the new output timelapse at "{output_file}"')
     start = time.perf_counter()
-    combineTimelapse(concat_file, output_file)
+    combineTimelapse(files, concat_file, output_file)
     end = time.perf_counter()
     duration = end - start
     logger.info(
@@ -1011,7 +2417,7 @@ def logCombineTimelapse(concat_file: pathlib.Path, output_file: pathlib.Path) ->
 # Function to create the combined video timelapse
 def createCombinedTimelapse(video_files: list):
     concat_video = pathlib.Path.joinpath(timelapse_args.temp_directory, "video.txt")
-    concatFile(video_order, concat_video, True)
+    concat_files = concatFile(video_order, concat_video, True)
     # Check if a output timelapse already exists
     output = pathlib.Path.joinpath(timelapse_args.output_directory, "timelapse.mp4")
     if checkPath(output):
@@ -1023,11 +2429,11 @@ def createCombinedTimelapse(video_files: list):
                 "Deleted existing output video",
             )
             # Create the timelapse
-            logCombineTimelapse(concat_video, output)
+            logCombineTimelapse(concat_files, concat_video, output)
     # If the file doesn't exist (duplicate code :pained_emoji:)
     else:
         # Create the timelapse
-        logCombineTimelapse(concat_video, output)
+        logCombineTimelapse(concat_files, concat_video, output)
     # Delete the temporary video files if that setting is enabled
     if not timelapse_args.keep_temp_video:
         logger.info(f"Deleting all the temp videos")
@@ -1058,6 +2464,9 @@ def generateTempo(speed: float) -> str:
     # If we're making it faster we can use up to 100, but going over 2 skips sounds
     elif speed > 2:
         speed_type = True
+    # If it's already in the range a single atempo can handle
+    else:
+        return f"atempo={speed}"
     # Variables to store the results
     new_speed = speed
     rounds = 0
@@ -1102,185 +2511,71 @@ def timelapseAudio(
     cut_from_end: bool,
     fade_in: float,
     fade_out: float,
-) -> None:
-    # Variables for handling the current process
-    current_input = file
-    ## FFmpeg is a little fucky so I think I have to do these in multiple steps
-
-    # Check if the file needs no modification
-    if not (
-        (cut_in != 0 or cut_out != 0)
-        or (speed_factor != 0 and speed_factor != 1)
-        or (fade_in != 0 or fade_out != 0)
-    ):
-        # All we need to do is change the codec to match the rest of the audio
-        terms = f'ffmpeg -i "{file}" '
-        # Add the threads
-        if timelapse_args.threads != -1:
-            terms += f"-threads {timelapse_args.threads} "
-        # Add the rest of the terms
-        terms += f'-c:a mp3 "{final_output}"'
-        # Run ffmpeg
-        runFFmpeg(terms)
-        # We can skip the rest of the function and save a whopping 2 conditionals.
-        return
-
-    # Bool to not delete if getting the source
-    first = True
-
-    # FFmpeg clip the audio
-    if cut_in != 0 or cut_out != 0:
-        logger.info(f'Clipping the temp audio of "{file}"')
-        start = time.perf_counter()
-        # Get durations
-        cut_duration = getClipTime(current_input, cut_in, cut_out, cut_from_end, False)
-        terms = "ffmpeg "
+) -> bool:
+    # The clip, speed, and fade are all done in one filter graph so the audio is only encoded once
+    logger.info(f'Rendering the temp audio of "{file}"')
+    start = time.perf_counter()
+    # Bools for what modifications are being done
+    clipping = cut_in != 0 or cut_out != 0
+    speeding = speed_factor != 0 and speed_factor != 1
+    fading = fade_in != 0 or fade_out != 0
+    terms = "ffmpeg "
+    # Get the clipped length (only probe the source if we need the length)
+    if clipping:
+        cut_duration = getClipTime(file, cut_in, cut_out, cut_from_end, False)
         # Add the beginning cut
         if cut_duration["cut_in"] != 0:
             terms += f'-ss {cut_duration["cut_in"]} '
-        # Check other possibilities to see what output to use
-        if (fade_in != 0 or fade_out != 0) or (speed_factor != 0 and speed_factor != 1):
-            # Add the input file (can copy codec on the trim)
-            terms += f'-i "{file}" '
-            # Add the threads
-            if timelapse_args.threads != -1:
-                terms += f"-threads {timelapse_args.threads} "
-            # Add the rest of the terms
-            terms += f"-c:a copy "
-            temp_file = f"{file.stem}c{file.suffix}"
-            output = pathlib.Path.joinpath(timelapse_args.temp_directory, temp_file)
-            # Add the trim
-            if cut_duration["cut_out"] != 0:
-                terms += f'-t {cut_duration["new_duration"]} "{output}"'
-            else:
-                terms += f'"{output}"'
-            # Run ffmpeg (duplicate code to save 2 conditionals)
-            runFFmpeg(terms)
-            current_input = output
-            end = time.perf_counter()
-            duration = end - start
-            logger.info(
-                f'Successfully clipped the temp audio of "{file} after {duration} seconds'
-            )
-            # Set first to false
-            first = False
-        else:
-            # Add the input file (Need to change the codec since it wont be in another step)
-            terms += f'-i "{file}" '
-            # Add the threads
-            if timelapse_args.threads != -1:
-                terms += f"-threads {timelapse_args.threads} "
-            # Add the rest of the terms
-            terms += f"-c:a mp3 "
-            output = final_output
-            # Add the trim
-            if cut_duration["cut_out"] != 0:
-                terms += f'-t {cut_duration["new_duration"]} "{output}"'
-            else:
-                terms += f'"{output}"'
-            # Run ffmpeg (duplicate code to save 2 conditionals)
-            runFFmpeg(terms)
-            current_input = output
-            end = time.perf_counter()
-            duration = end - start
-            logger.info(
-                f'Successfully clipped the temp audio of "{file} after {duration} seconds'
-            )
-            return
-
-    # FFmpeg speed up the audio
-    if speed_factor != 0 and speed_factor != 1:
-        logger.info(f'Speeding up the temp audio of "{file}"')
-        start = time.perf_counter()
-        terms = "ffmpeg "
-        # Add the input file and speed up factor (need to change codec)
-        terms += f'-i "{current_input}" '
-        # Add the threads
-        if timelapse_args.threads != -1:
-            terms += f"-threads {timelapse_args.threads} "
-        # Add the rest of the terms
-        tempo = generateTempo(speed_factor)
-        terms += f'-af "{tempo}" -c:a mp3 '
-        # Check other possibilities to see what output to use
-        if fade_in != 0 or fade_out != 0:
-            temp_file = f"{file.stem}s{file.suffix}"
-            output = pathlib.Path.joinpath(timelapse_args.temp_directory, temp_file)
-            # Remove audio (have to add the codec or it doesn't work, copying it doesn't work)
-            terms += f'"{output}"'
-            # Run ffmpeg (duplicate code to save a conditional :pain:)
-            runFFmpeg(terms)
-            # Remove if not getting from source (getting from temporary)
-            if not first:
-                os.remove(current_input)
-            else:
-                first = False
-            current_input = output
-            end = time.perf_counter()
-            duration = end - start
-            logger.info(
-                f'Successfully sped the temp audio of "{file} after {duration} seconds'
-            )
-        else:
-            output = final_output
-            terms += f'"{output}"'
-            # Run ffmpeg (duplicate code to save a conditional :pain:)
-            runFFmpeg(terms)
-            # Remove if not getting from source (getting from temporary)
-            if not first:
-                os.remove(current_input)
-            current_input = output
-            end = time.perf_counter()
-            duration = end - start
-            logger.info(
-                f'Successfully sped the temp audio of "{file} after {duration} seconds'
-            )
-            return
-
-    # FFmpeg fade the video
-    if fade_in != 0 or fade_out != 0:
-        logger.info(f'Fading the temp audio of "{file}"')
-        start = time.perf_counter()
-        # Get durations
-        fade_duration = getFadeTime(current_input, fade_in, fade_out)
-        terms = "ffmpeg "
-        # Add the input file
-        terms += f'-i "{current_input}" '
-        # Add the threads
-        if timelapse_args.threads != -1:
-            terms += f"-threads {timelapse_args.threads} "
-        # Add the fades
-        terms += f'-af "'
+        # Add the trim (as an input option so it's the length after the beginning cut)
+        if cut_duration["cut_out"] != 0:
+            terms += f'-t {cut_duration["output_length"]} '
+    # Add the input file
+    terms += f'-i "{file}" '
+    # Add the threads
+    if timelapse_args.threads != -1:
+        terms += f"-threads {timelapse_args.threads} "
+    # Create the audio filter chain
+    audio_filters = []
+    # Add the speed up
+    if speeding:
+        audio_filters.append(generateTempo(speed_factor))
+    # Add the fades (timed from the planned output length instead of probing an intermediate file)
+    if fading:
+        planned_duration = planClipLength(
+            file, speed_factor, cut_in, cut_out, cut_from_end
+        )
+        fade_duration = calcFadeTime(file, planned_duration, fade_in, fade_out)
         # Add the fade in if there is one
         if fade_duration["fade_in_l"] != 0:
-            terms += f'afade=t=in:st=0:d={fade_duration["fade_in_l"]},'
+            audio_filters.append(f'afade=t=in:st=0:d={fade_duration["fade_in_l"]}')
         # Add the fade out if there is one
         if fade_duration["fade_out_l"] != 0:
-            terms += f'afade=t=out:st={fade_duration["fade_out_s"]}:d={fade_duration["fade_out_l"]}"'
-        # If there isn't a fade out replace the comma with a double quote
-        else:
-            terms = terms[:-1]
-            terms += f'"'
-        # Change the audio codec (can't seem to copy it if fading)
-        terms += f' -c:a mp3 "{final_output}"'
-        # Run ffmpeg
-        runFFmpeg(terms)
-        # Remove if not getting from source (getting from temporary)
-        if not first:
-            os.remove(current_input)
-        end = time.perf_counter()
-        duration = end - start
-        logger.info(
-            f'Successfully faded the temp audio of "{file} after {duration} seconds'
-        )
-        return  # Useless return, but whatever
+            audio_filters.append(
+                f'afade=t=out:st={fade_duration["fade_out_s"]}:d={fade_duration["fade_out_l"]}'
+            )
+    if len(audio_filters) != 0:
+        terms += f'-af "{",".join(audio_filters)}" '
+    # Change the codec to match the rest of the audio
+    terms += f'-c:a mp3 "{final_output}"'
+    # Run ffmpeg
+    return_code = runFFmpeg(terms)
+    end = time.perf_counter()
+    duration = end - start
+    if return_code != 0:
+        logger.warning(f'FFmpeg failed to render the temp audio of "{file}"')
+        return False
+    logger.info(
+        f'Successfully rendered the temp audio of "{file}" after {duration} seconds'
+    )
+    return True
 
 
 # Function to create the audio and the log info
-def logAudio(audio: pathlib.Path, output: pathlib.Path, index: int) -> None:
+def logAudio(audio: pathlib.Path, output: pathlib.Path, index: int) -> bool:
     # Create the new timelapse
     logger.info(f'Creating modified audio of "{audio}" at "{output}"')
     start = time.perf_counter()
-    timelapseAudio(
+    success = timelapseAudio(
         audio,
         output,
         user_answers[audio][index]["speed_factor"],
@@ -1293,6 +2588,7 @@ def logAudio(audio: pathlib.Path, output: pathlib.Path, index: int) -> None:
     end = time.perf_counter()
     duration = end - start
     logger.info(f'Successfully modified audio of "{audio}" after {duration} seconds')
+    return success
 
 
 # Function to create audio (modify all the audio files)
@@ -1305,21 +2601,19 @@ def createAudio(audio_files: list) -> None:
             output = pathlib.Path.joinpath(
                 timelapse_args.temp_directory, f"{audio.stem}_{index}{audio.suffix}"
             )
-            # Check if a timelapse already exists
-            if checkPath(output):
-                # Delete the existing file if that setting is enabled
-                if timelapse_args.override_temp_audio:
-                    delLog(
-                        output,
-                        "Deleting existing temp audio",
-                        "Deleted existing temp audio",
-                    )
-                    # Create the new timelapse
-                    logAudio(audio, output, index)
-            # If the file doesn't exist just create it
-            else:
-                # Create the new timelapse
-                logAudio(audio, output, index)
+            # Check if the audio needs to be created
+            key = renderKey(audio, audio_settings[index], "audio")
+            if needsRender(
+                output,
+                key,
+                timelapse_args.override_temp_audio,
+                "Deleting existing temp audio",
+                "Deleted existing temp audio",
+            ):
+                # Create the new audio
+                success = logAudio(audio, output, index)
+                # Record what the audio was rendered from
+                recordRender(output, key, success)
         # Delete the source video file if that setting is enabled
         if timelapse_args.delete_audio:
             delLog(
@@ -1329,84 +2623,54 @@ def createAudio(audio_files: list) -> None:
 
 # Function to combine the audio
 def combineAudio(concat_file: pathlib.Path, output_file: pathlib.Path) -> None:
-    # Check if using a fade on the output
+    # Merge the audio files
+    audio_terms = f'ffmpeg -f concat -safe 0 -i "{concat_file}" '
+    # Add the threads
+    if timelapse_args.threads != -1:
+        audio_terms += f"-threads {timelapse_args.threads} "
+    # If not using a fade just output it
     if (
-        timelapse_args.output_audio_fade_in != 0
-        or timelapse_args.output_audio_fade_out != 0
+        timelapse_args.output_audio_fade_in == 0
+        and timelapse_args.output_audio_fade_out == 0
     ):
-        # Temporary path
+        audio_terms += f'-c:a mp3 "{output_file}"'
+        runFFmpeg(audio_terms)
+        return
+    logger.info(f'Creating the faded output audio "{output_file}"')
+    start = time.perf_counter()
+    # Get durations
+    fade_duration = getFadeTime(
+        output_file,
+        timelapse_args.output_audio_fade_in,
+        timelapse_args.output_audio_fade_out,
+    )
+    audio_filters = ",".join(fadeFilters(fade_duration, "afade"))
+    # If keeping the unfaded output split the decoded audio between both outputs
+    if timelapse_args.keep_unfaded_audio:
+        # Path of the unfaded output
         temp_out = pathlib.Path.joinpath(
             timelapse_args.output_directory, "audio_plain.wav"
         )
-        logger.info(f'Creating the unfaded output audio "{temp_out}"')
-        start = time.perf_counter()
-        # Create the combined file
-        audio_terms = f'ffmpeg -f concat -safe 0 -i "{concat_file}" '
-        # Add the threads
-        if timelapse_args.threads != -1:
-            audio_terms += f"-threads {timelapse_args.threads} "
-        # Add the rest of the terms
-        audio_terms += f'-c:a mp3 "{temp_out}"'
-        runFFmpeg(audio_terms)
-        end = time.perf_counter()
-        duration = end - start
-        logger.info(
-            f'Created the unfaded output audio "{temp_out}" after {duration} seconds'
-        )
-        # Create t
-        # Create the fade
-        logger.info(f'Fading the output audio "{output_file}"')
-        start = time.perf_counter()
-        # Get durations
-        fade_duration = getFadeTime(
-            temp_out,
-            timelapse_args.output_audio_fade_in,
-            timelapse_args.output_audio_fade_out,
-        )
-        audio_terms = "ffmpeg "
-        # Add the input file
-        audio_terms += f'-i "{temp_out}" '
-        # Add the threads
-        if timelapse_args.threads != -1:
-            audio_terms += f"-threads {timelapse_args.threads} "
-        # Add the fades
-        audio_terms += f'-af "'
-        # Add the fade in if there is one
-        if fade_duration["fade_in_l"] != 0:
-            audio_terms += f'afade=t=in:st=0:d={fade_duration["fade_in_l"]},'
-        # Add the fade out if there is one
-        if fade_duration["fade_out_l"] != 0:
-            audio_terms += f'afade=t=out:st={fade_duration["fade_out_s"]}:d={fade_duration["fade_out_l"]}"'
-        # If there isn't a fade out replace the comma with a double quote
-        else:
-            audio_terms = audio_terms[:-1]
-            audio_terms += f'"'
-        # Change the audio codec (can't seem to copy it if fading)
-        audio_terms += f' -c:a mp3 "{output_file}"'
-        # Run ffmpeg
-        runFFmpeg(audio_terms)
-        # Remove the temp file if setting isn't enabled
-        if not timelapse_args.keep_unfaded_audio:
-            os.remove(temp_out)
-        end = time.perf_counter()
-        duration = end - start
-        logger.info(
-            f'Successfully faded the output audio "{output_file}" after {duration} seconds'
-        )
-    # If not using a fade just output it
+        planned_lengths[temp_out] = getPlannedLength(output_file)
+        audio_terms += f'-filter_complex "[0:a]asplit=2[plain][fade];[fade]{audio_filters}[faded]" '
+        audio_terms += f'-map "[plain]" -c:a mp3 "{temp_out}" '
+        audio_terms += f'-map "[faded]" -c:a mp3 "{output_file}"'
+    # If not just create the faded output
     else:
-        # Merge the audio files
-        audio_terms = f'ffmpeg -f concat -safe 0 -i "{concat_file}" '
-        # Add the threads
-        if timelapse_args.threads != -1:
-            audio_terms += f"-threads {timelapse_args.threads} "
-        # Add the rest of the terms
-        audio_terms += f'-c:a mp3 "{output_file}"'
-        runFFmpeg(audio_terms)
+        audio_terms += f'-af "{audio_filters}" -c:a mp3 "{output_file}"'
+    # Run ffmpeg
+    runFFmpeg(audio_terms)
+    end = time.perf_counter()
+    duration = end - start
+    logger.info(
+        f'Successfully faded the output audio "{output_file}" after {duration} seconds'
+    )
 
 
 # Function to create the combined audio and log
 def logCombineAudio(concat_file: pathlib.Path, output_file: pathlib.Path) -> None:
+    # Plan the length of the output from the clips
+    planned_lengths[output_file] = planCombinedLength(audio_order)
     # Create the audio for the timelapse
     logger.info(f'Creating the new audio for the timelapse at "{output_file}"')
     start = time.perf_counter()
@@ -1460,6 +2724,117 @@ def createCombinedAudio(audio_files: list):
     )
 
 
+# Function to get the length of an image video (rounded to whole output frames)
+def getImageLength(image_length: float) -> float:
+    output_frames = int(round(image_length * timelapse_args.output_fps, 0))
+    return output_frames / timelapse_args.output_fps
+
+
+# Function to plan the length of a clip after clipping and speeding (without probing the output)
+def planClipLength(
+    file: pathlib.Path,
+    speed_factor: float,
+    cut_in: float,
+    cut_out: float,
+    cut_from_end: bool,
+    duration: Union[float, None] = None,
+) -> float:
+    # Get the length of the source (if it isn't already known)
+    if duration is None:
+        duration = getLength(file)
+    # Get the clipped length
+    if cut_in != 0 or cut_out != 0:
+        clipped_duration = getClipTime(
+            file, cut_in, cut_out, cut_from_end, False, duration
+        )["output_length"]
+    else:
+        clipped_duration = duration
+    # If the parts of the clip have different speeds (or are skipped) add up the parts
+    segments = getClipSegments(
+        file, speed_factor, cut_in, cut_out, cut_from_end, duration
+    )
+    if len(segments) != 0:
+        return sum((x[1] - x[0]) / x[2] for x in segments if x[2] is not None)
+    # Speed up the length
+    if speed_factor != 0 and speed_factor != 1:
+        return clipped_duration / speed_factor
+    else:
+        return clipped_duration
+
+
+# Function to plan the length of every temp file from the source files and settings
+def planLengths(user_answers: dict) -> Dict[pathlib.Path, float]:
+    # Variable to store the lengths
+    plan = {}
+    # Get all of the files and their clips from the settings
+    for file, data in user_answers.items():
+        # Get the amount of clips
+        for index in range(len(data)):
+            # Generate paths and get the lengths
+            if file.is_dir():
+                new_path = pathlib.Path.joinpath(
+                    timelapse_args.temp_directory, f"{file.name}_sequence_{index}.mp4"
+                )
+                plan[new_path] = planClipLength(
+                    file,
+                    data[index]["speed_factor"],
+                    data[index]["clip_in"],
+                    data[index]["clip_out"],
+                    data[index]["clip_from_end"],
+                )
+            elif file.suffix.lower() in [".mp4", ".mkv"]:
+                new_path = pathlib.Path.joinpath(
+                    timelapse_args.temp_directory, f"{file.stem}_{index}{file.suffix}"
+                )
+                plan[new_path] = planClipLength(
+                    file,
+                    data[index]["speed_factor"],
+                    data[index]["clip_in"],
+                    data[index]["clip_out"],
+                    data[index]["clip_from_end"],
+                )
+            elif file.suffix.lower() in [".png", ".jpg"]:
+                new_path = pathlib.Path.joinpath(
+                    timelapse_args.temp_directory, f"{file.stem}_{index}.mp4"
+                )
+                # The speed factor of an image is how many seconds it lasts (and it isn't sped up)
+                plan[new_path] = planClipLength(
+                    file,
+                    0,
+                    data[index]["clip_in"],
+                    data[index]["clip_out"],
+                    data[index]["clip_from_end"],
+                    getImageLength(data[index]["speed_factor"]),
+                )
+            elif file.suffix.lower() in [".wav", ".mp3"]:
+                new_path = pathlib.Path.joinpath(
+                    timelapse_args.temp_directory, f"{file.stem}_{index}{file.suffix}"
+                )
+                plan[new_path] = planClipLength(
+                    file,
+                    data[index]["speed_factor"],
+                    data[index]["clip_in"],
+                    data[index]["clip_out"],
+                    data[index]["clip_from_end"],
+                )
+    return plan
+
+
+# Function to get the planned length of a file (probing it if it isn't in the plan)
+def getPlannedLength(file: pathlib.Path) -> float:
+    if file in planned_lengths:
+        return planned_lengths[file]
+    return getLength(file)
+
+
+# Function to plan the length of combining the files in an order
+def planCombinedLength(order: dict) -> float:
+    total = 0
+    for file in order.values():
+        total += getPlannedLength(file)
+    return total
+
+
 # Function to get the cut times
 def getClipTime(
     file: pathlib.Path,
@@ -1467,9 +2842,11 @@ def getClipTime(
     cut_out: float,
     cut_out_from_end: bool,
     prompted: bool,
+    duration: Union[float, None] = None,
 ) -> dict:
-    # Get the length of the file
-    duration = getLength(file)
+    # Get the length of the file (if it isn't already known)
+    if duration is None:
+        duration = getLength(file)
     # If we are cutting seconds from the end
     if cut_out_from_end:
         # Get the time to cut at
@@ -1574,8 +2951,18 @@ def getFadeTime(
     fade_in_l: float,
     fade_out_l: float,
 ) -> dict:
-    # Get the length of the file
-    duration = getLength(file)
+    # Get the length of the file (from the plan if the pipeline is creating it)
+    duration = getPlannedLength(file)
+    return calcFadeTime(file, duration, fade_in_l, fade_out_l)
+
+
+# Function to get the fade times from a known duration
+def calcFadeTime(
+    file: pathlib.Path,
+    duration: float,
+    fade_in_l: float,
+    fade_out_l: float,
+) -> dict:
     # Get the fade times
     fade_out_s = duration - fade_out_l
     # Checking to make sure the fades aren't longer than the video
@@ -1867,7 +3254,12 @@ def promptOrder(user_answers: dict) -> Tuple[dict, dict]:
         # Get the amount of clips
         for index in range(len(data)):
             # Generate paths
-            if file.suffix.lower() in [".mp4", ".mkv"]:
+            if file.is_dir():
+                new_path = pathlib.Path.joinpath(
+                    timelapse_args.temp_directory, f"{file.name}_sequence_{index}.mp4"
+                )
+                video_order[new_path] = file
+            elif file.suffix.lower() in [".mp4", ".mkv"]:
                 new_path = pathlib.Path.joinpath(
                     timelapse_args.temp_directory, f"{file.stem}_{index}{file.suffix}"
                 )
@@ -1987,181 +3379,189 @@ def addAudio(video_path: pathlib.Path, audio_path: pathlib.Path) -> None:
     )
     # Check if a output audio already exists
     if checkPath(video_out_audio):
-        # Delete the existing output video with audio file if that setting is enabled
-        if timelapse_args.override_output:
-            logger.info(
-                f'Deleting existing output video with audio "{video_out_audio}"'
-            )
-            os.remove(video_out_audio)
-            logger.info(f'Deleted existing output video with audio "{video_out_audio}"')
-            # Create the video with audio
-            video_audio_terms = (
-                f'ffmpeg -i "{video_path}" -i "{audio_path}" -vf "{resize_vf}" '
-            )
-            # If the audio was supposed to have a faded output do it here too.
-            # The output fade for the video will work because it is longer, but since the audio is longer
-            # the output fade out will be clipped unless it's the exact same length as the video.
-            if (
-                timelapse_args.output_audio_fade_in != 0
-                or timelapse_args.output_audio_fade_out != 0
-            ):
-                fade_duration = getFadeTime(
-                    video_path,
-                    timelapse_args.output_audio_fade_in,
-                    timelapse_args.output_audio_fade_out,
-                )
-                video_audio_terms += f'-af "'
-                # Add the fade in if there is one
-                if fade_duration["fade_in_l"] != 0:
-                    video_audio_terms += (
-                        f'afade=t=in:st=0:d={fade_duration["fade_in_l"]},'
-                    )
-                # Add the fade out if there is one
-                if fade_duration["fade_out_l"] != 0:
-                    video_audio_terms += f'afade=t=out:st={fade_duration["fade_out_s"]}:d={fade_duration["fade_out_l"]}" '
-                # If there isn't a fade out replace the comma with a double quote
-                else:
-                    video_audio_terms = video_audio_terms[:-1]
-                    video_audio_terms += f'" '
-                # I think I need to add this because of the fade, but don't need to add the codec to video since it's not modified
-                video_audio_terms += f"-c:a mp3 "
-            # Add the threads
-            if timelapse_args.threads != -1:
-                video_audio_terms += f"-threads {timelapse_args.threads} "
-            # Add the rest of the terms
-            video_audio_terms += f'-map 0:v:0 -map 1:a:0 -shortest "{video_out_audio}"'
-            # Create the timelapse
-            logger.info(f'Creating the timelapse with audio at "{video_out_audio}"')
-            start = time.perf_counter()
-            # Run the command and wait for it to finish
-            runFFmpeg(video_audio_terms)
-            end = time.perf_counter()
-            duration = end - start
-            logger.info(
-                f'Successfully created the timelapse with audio at "{video_out_audio}" after {duration} seconds'
-            )
-    # If the file doesn't exist (duplicate code :pained_emoji:)
+        # Keep the existing output video with audio if that setting isn't enabled
+        if not timelapse_args.override_output:
+            return
+        # Delete the existing output video with audio file
+        logger.info(f'Deleting existing output video with audio "{video_out_audio}"')
+        os.remove(video_out_audio)
+        logger.info(f'Deleted existing output video with audio "{video_out_audio}"')
+    # Plan the length of the output (it ends with the shortest file)
+    planned_lengths[video_out_audio] = min(
+        getPlannedLength(video_path), getPlannedLength(audio_path)
+    )
+    # Create the video with audio
+    video_audio_terms = f'ffmpeg -i "{video_path}" -i "{audio_path}" '
+    # If the video is already the output size just copy it (we're only adding the audio)
+    if checkResolution(video_path):
+        video_audio_terms += f"-c:v copy "
+    # If not resize it
     else:
-        # Create the video with audio
-        video_audio_terms = (
-            f'ffmpeg -i "{video_path}" -i "{audio_path}" -vf "{resize_vf}" '
+        video_audio_terms += f'-vf "{resize_vf}" -c:v libx265 -r {timelapse_args.output_fps} '
+    # If the audio was supposed to have a faded output do it here too.
+    # The output fade for the video will work because it is longer, but since the audio is longer
+    # the output fade out will be clipped unless it's the exact same length as the video.
+    output_audio_fade = (
+        timelapse_args.output_audio_fade_in != 0
+        or timelapse_args.output_audio_fade_out != 0
+    )
+    if output_audio_fade:
+        fade_duration = getFadeTime(
+            video_out_audio,
+            timelapse_args.output_audio_fade_in,
+            timelapse_args.output_audio_fade_out,
         )
-        # Copied code from above
-        if (
-            timelapse_args.output_audio_fade_in != 0
-            or timelapse_args.output_audio_fade_out != 0
-        ):
-            fade_duration = getFadeTime(
-                video_path,
-                timelapse_args.output_audio_fade_in,
-                timelapse_args.output_audio_fade_out,
-            )
-            video_audio_terms += f'-af "'
-            # Add the fade in if there is one
-            if fade_duration["fade_in_l"] != 0:
-                video_audio_terms += f'afade=t=in:st=0:d={fade_duration["fade_in_l"]},'
-            # Add the fade out if there is one
-            if fade_duration["fade_out_l"] != 0:
-                video_audio_terms += f'afade=t=out:st={fade_duration["fade_out_s"]}:d={fade_duration["fade_out_l"]}" '
-            # If there isn't a fade out replace the comma with a double quote
-            else:
-                video_audio_terms = video_audio_terms[:-1]
-                video_audio_terms += f'" '
-            # I think I need to add this because of the fade, but don't need to add the codec to video since it's not modified
-            video_audio_terms += f"-c:a mp3 "
-        # Add the threads
-        if timelapse_args.threads != -1:
-            video_audio_terms += f"-threads {timelapse_args.threads} "
-        # Add the rest of the terms
-        video_audio_terms += f'-map 0:v:0 -map 1:a:0 -shortest "{video_out_audio}"'
-        # Create the timelapse
-        logger.info(f'Creating the timelapse with audio at "{video_out_audio}"')
-        start = time.perf_counter()
-        # Run the command and wait for it to finish
-        runFFmpeg(video_audio_terms)
-        end = time.perf_counter()
-        duration = end - start
-        logger.info(
-            f'Successfully created the timelapse with audio at "{video_out_audio}" after {duration} seconds'
+        video_audio_terms += f'-af "{",".join(fadeFilters(fade_duration, "afade"))}" '
+        # The audio has to be encoded because of the fade
+        video_audio_terms += f"-c:a mp3 "
+    # Add the threads
+    if timelapse_args.threads != -1:
+        video_audio_terms += f"-threads {timelapse_args.threads} "
+    # Add the rest of the terms
+    video_audio_terms += f'-map 0:v:0 -map 1:a:0 -shortest "{video_out_audio}"'
+    # Create the modified output from the same decode
+    if checkModifiedOutput():
+        video_audio_terms += f" -shortest "
+        # The output audio fades are applied before the modified output fades
+        video_audio_terms += modifiedOutputTerms(
+            video_out_audio,
+            "0:v:0",
+            [] if checkResolution(video_path) else [resize_vf],
+            "1:a:0",
+            fadeFilters(fade_duration, "afade") if output_audio_fade else [],
         )
+    # Create the timelapse
+    logger.info(f'Creating the timelapse with audio at "{video_out_audio}"')
+    start = time.perf_counter()
+    # Run the command and wait for it to finish
+    runFFmpeg(video_audio_terms)
+    end = time.perf_counter()
+    duration = end - start
+    logger.info(
+        f'Successfully created the timelapse with audio at "{video_out_audio}" after {duration} seconds'
+    )
+
+
+# Function to get the path of the modified timelapse
+def getModifiedPath() -> pathlib.Path:
+    return pathlib.Path.joinpath(
+        timelapse_args.output_directory, "timelapse_modified.mp4"
+    )
+
+
+# Function to check if the audio will be added to the timelapse
+def checkAddingAudio() -> bool:
+    audio_out = pathlib.Path.joinpath(timelapse_args.output_directory, "audio.wav")
+    return (
+        len(audio_files) != 0
+        or len(timelapse_audio_files) != 0
+        or checkPath(audio_out)
+    )
 
 
-# Function to create the modified output
-def createModifiedOutput(
-    input_path: pathlib.Path, output_path: pathlib.Path, file_type: bool
-) -> None:
-    # Create the timelapse
-    logger.info(f'Creating the modified timelapse at "{output_path}"')
-    start = time.perf_counter()
-    # Basic terms
-    video_terms = f'ffmpeg -i "{input_path}" '
-    # Add the threads
-    if timelapse_args.threads != -1:
-        video_terms += f"-threads {timelapse_args.threads} "
-        # Add the rest of the terms
+# Function to check if the modified timelapse should be created (deleting the existing one if overriding)
+def checkModifiedOutput() -> bool:
+    # If not resizing or compressing there is no modified output
+    if timelapse_args.resize == 0 and timelapse_args.compression_level == -1:
+        return False
+    modified_video_out = getModifiedPath()
+    # If it was already created in this run
+    if modified_video_out in created_outputs:
+        return False
+    # Check if a modified output already exists
+    if checkPath(modified_video_out):
+        # Keep the existing modified output if that setting isn't enabled
+        if not timelapse_args.override_output:
+            return False
+        logger.info(
+            f'Deleting existing modified output timelapse "{modified_video_out}"'
+        )
+        os.remove(modified_video_out)
+        logger.info(f'Deleted existing modified output timelapse "{modified_video_out}"')
+    return True
+
+
+# Function to get the output terms of the modified timelapse (added to the ffmpeg command of another output)
+def modifiedOutputTerms(
+    input_path: pathlib.Path,
+    video_map: str,
+    video_filters: List[str],
+    audio_map: Union[str, None],
+    audio_filters: List[str],
+) -> str:
+    modified_video_out = getModifiedPath()
+    # It's the same length as the output it's made with
+    planned_lengths[modified_video_out] = getPlannedLength(input_path)
+    # Mark it as created so the modified output stage doesn't encode it again
+    created_outputs.add(modified_video_out)
+    logger.info(f'Creating the modified timelapse at "{modified_video_out}"')
     # If we are resizing the video
+    video_filters = list(video_filters)
     if timelapse_args.resize != 0:
-        video_terms += (
-            f'-vf "scale=iw*{timelapse_args.resize}:ih*{timelapse_args.resize}" '
+        video_filters.append(
+            f"scale=iw*{timelapse_args.resize}:ih*{timelapse_args.resize}"
         )
-    if timelapse_args.compression_level != -1:
-        video_terms += f"-crf {timelapse_args.compression_level} "
     # Check if we're applying any video fade
     if (
         timelapse_args.modified_output_video_fade_in != 0
         or timelapse_args.modified_output_video_fade_out != 0
     ):
-        # Get the fades
         video_fade_duration = getFadeTime(
-            input_path,
+            modified_video_out,
             timelapse_args.modified_output_video_fade_in,
             timelapse_args.modified_output_video_fade_out,
         )
-        # Add the fades
-        terms += f'-vf "'
-        # Add the fade in if there is one
-        if video_fade_duration["fade_in_l"] != 0:
-            terms += f'fade=t=in:st=0:d={video_fade_duration["fade_in_l"]},'
-        # Add the fade out if there is one
-        if video_fade_duration["fade_out_l"] != 0:
-            terms += f'fade=t=out:st={video_fade_duration["fade_out_s"]}:d={video_fade_duration["fade_out_l"]}" '
-        # If there isn't a fade out replace the comma with a double quote
-        else:
-            terms = terms[:-1]
-            terms += f'" '
-    # Check if we're applying any audio fade (and will have audio in the modified output)
-    if (
-        timelapse_args.modified_output_video_fade_in != 0
-        or timelapse_args.modified_output_video_fade_out != 0
-    ) and (not file_type or timelapse_args.preserve_audio):
-        # Get the fades
-        audio_fade_duration = getFadeTime(
-            input_path,
-            timelapse_args.modified_output_audio_fade_in,
-            timelapse_args.modified_output_audio_fade_out,
-        )
-        # Add the fades
-        terms += f'-af "'
-        # Add the fade in if there is one
-        if audio_fade_duration["fade_in_l"] != 0:
-            terms += f'afade=t=in:st=0:d={audio_fade_duration["fade_in_l"]},'
-        # Add the fade out if there is one
-        if audio_fade_duration["fade_out_l"] != 0:
-            terms += f'afade=t=out:st={audio_fade_duration["fade_out_s"]}:d={audio_fade_duration["fade_out_l"]}" '
-        # If there isn't a fade out replace the comma with a double quote
-        else:
-            terms = terms[:-1]
-            terms += f'" '
+        video_filters += fadeFilters(video_fade_duration, "fade")
+    terms = f"-map {video_map} "
+    if len(video_filters) != 0:
+        terms += f'-vf "{",".join(video_filters)}" '
     # Change the video codec
-    video_terms += f"-c:v libx265 "
-    # If it's a timelapse with audio, or we're preserving audio change the audio codec
-    if not file_type or timelapse_args.preserve_audio:
-        video_terms += f"-c:a mp3 "
+    terms += f"-c:v libx265 -r {timelapse_args.output_fps} "
+    if timelapse_args.compression_level != -1:
+        terms += f"-crf {timelapse_args.compression_level} "
+    # If it has audio
+    if audio_map is not None:
+        # Check if we're applying any audio fade
+        audio_filters = list(audio_filters)
+        if (
+            timelapse_args.modified_output_audio_fade_in != 0
+            or timelapse_args.modified_output_audio_fade_out != 0
+        ):
+            audio_fade_duration = getFadeTime(
+                modified_video_out,
+                timelapse_args.modified_output_audio_fade_in,
+                timelapse_args.modified_output_audio_fade_out,
+            )
+            audio_filters += fadeFilters(audio_fade_duration, "afade")
+        terms += f"-map {audio_map} "
+        if len(audio_filters) != 0:
+            terms += f'-af "{",".join(audio_filters)}" '
+        terms += f"-c:a mp3 "
     # If it's just video remove the audio
     else:
-        video_terms += f"-an "
-    # Add the rest of the terms
-    video_terms += f'-r {timelapse_args.output_fps} "{output_path}"'
+        terms += f"-an "
+    # Add the threads
+    if timelapse_args.threads != -1:
+        terms += f"-threads {timelapse_args.threads} "
+    # Output
+    terms += f'"{modified_video_out}"'
+    return terms
+
+
+# Function to create the modified output
+def createModifiedOutput(
+    input_path: pathlib.Path, output_path: pathlib.Path, has_audio: bool
+) -> None:
+    # Create the timelapse
+    start = time.perf_counter()
+    # Basic terms
+    video_terms = f'ffmpeg -i "{input_path}" '
+    # If it's a timelapse with audio, or we're preserving audio keep the audio
+    if has_audio or timelapse_args.preserve_audio:
+        video_terms += modifiedOutputTerms(input_path, "0:v:0", [], "0:a?", [])
+    # If it's just video remove the audio
+    else:
+        video_terms += modifiedOutputTerms(input_path, "0:v:0", [], None, [])
     # Run ffmpeg
     runFFmpeg(video_terms)
     # End the log
@@ -2172,29 +3572,91 @@ def createModifiedOutput(
     )
 
 
-# Function to create the modified timelapse (resized and/or compressed)
-def modifyOutput(input_path: pathlib.Path, file_type: bool) -> None:
-    # Output path
-    modified_video_out = pathlib.Path.joinpath(
-        timelapse_args.output_directory, "timelapse_modified.mp4"
-    )
-    # Check if a output audio already exists
-    if checkPath(modified_video_out):
-        # Delete the existing output video with audio file if that setting is enabled
-        if timelapse_args.override_output:
-            logger.info(
-                f'Deleting existing modified output timelapse "{modified_video_out}"'
-            )
-            os.remove(modified_video_out)
-            logger.info(
-                f'Deleted existing modified output timelapse "{modified_video_out}"'
+# Function to create the modified timelapse (resized and/or compressed) if it wasn't created with the output
+def modifyOutput(input_path: pathlib.Path, has_audio: bool) -> None:
+    if checkModifiedOutput():
+        createModifiedOutput(input_path, getModifiedPath(), has_audio)
+
+
+# Function to get the filter that scales the video to a rendition
+def renditionFilter(rendition: dict) -> str:
+    width = rendition["width"]
+    height = rendition["height"]
+    # Scale it to cover the size and crop the rest
+    if rendition["mode"] == "crop":
+        return f"scale={width}:{height}:force_original_aspect_ratio=2,crop={width}:{height}"
+    # Scale it to fit in the size and pad the rest
+    return f"scale={width}:{height}:force_original_aspect_ratio=1,pad={width}:{height}:(( (ow - iw)/2 )):(( (oh - ih)/2 ))"
+
+
+# Function to create all the renditions from one decode of the output
+def createRenditions(input_path: pathlib.Path, has_audio: bool) -> None:
+    # Get the renditions that need to be created
+    renditions = []
+    for rendition in timelapse_args.renditions:
+        rendition_out = pathlib.Path.joinpath(
+            timelapse_args.output_directory,
+            f'timelapse_{rendition["width"]}x{rendition["height"]}.mp4',
+        )
+        # Check if the rendition already exists
+        if checkPath(rendition_out):
+            # Keep the existing rendition if that setting isn't enabled
+            if not timelapse_args.override_output:
+                continue
+            delLog(
+                rendition_out,
+                "Deleting existing rendition",
+                "Deleted existing rendition",
             )
-            # Create the timelapse
-            createModifiedOutput(input_path, modified_video_out, file_type)
-    # If the file doesn't exist (duplicate code :pained_emoji:)
-    else:
-        # Create the timelapse
-        createModifiedOutput(input_path, modified_video_out, file_type)
+        # The rendition the output already matches is just copied (if it has the same quality)
+        if (
+            rendition["width"] == timelapse_args.width
+            and rendition["height"] == timelapse_args.height
+            and rendition["mode"] == resize_mode
+            and rendition["crf"] == output_crf
+        ):
+            logger.info(f'Copying "{input_path}" to the rendition "{rendition_out}"')
+            terms = f'ffmpeg -i "{input_path}" -map 0:v -c:v copy '
+            if has_audio or timelapse_args.preserve_audio:
+                terms += f"-map 0:a? -c:a copy "
+            else:
+                terms += f"-an "
+            runFFmpeg(terms + f'"{rendition_out}"')
+            planned_lengths[rendition_out] = getPlannedLength(input_path)
+            continue
+        renditions.append((rendition, rendition_out))
+    if len(renditions) == 0:
+        return
+    logger.info(f"Creating {len(renditions)} renditions from \"{input_path}\"")
+    start = time.perf_counter()
+    terms = f'ffmpeg -i "{input_path}" '
+    # Add the threads
+    if timelapse_args.threads != -1:
+        terms += f"-threads {timelapse_args.threads} "
+    # Split the decoded video between the renditions
+    graph = f"[0:v]split={len(renditions)}"
+    graph += "".join(f"[split{index}]" for index in range(len(renditions)))
+    for index, (rendition, rendition_out) in enumerate(renditions):
+        graph += f";[split{index}]{renditionFilter(rendition)}[rendition{index}]"
+    terms += f'-filter_complex "{graph}" '
+    # Add the outputs
+    for index, (rendition, rendition_out) in enumerate(renditions):
+        planned_lengths[rendition_out] = getPlannedLength(input_path)
+        terms += f'-map "[rendition{index}]" -c:v libx265 -crf {rendition["crf"]} -r {timelapse_args.output_fps} '
+        # The audio is already encoded so it's copied
+        if has_audio or timelapse_args.preserve_audio:
+            terms += f"-map 0:a? -c:a copy "
+        # If it's just video remove the audio
+        else:
+            terms += f"-an "
+        terms += f'"{rendition_out}" '
+    # Run ffmpeg
+    runFFmpeg(terms[:-1])
+    end = time.perf_counter()
+    duration = end - start
+    logger.info(
+        f"Successfully created {len(renditions)} renditions after {duration} seconds"
+    )
 
 
 # Function to read json of the userSetting
@@ -2291,6 +3753,14 @@ def writeJson(file: pathlib.Path, userSettings: dict, file_type: bool) -> None:
 # Function to get the user to enter the information about the clip and fade for each file
 def userSettings(file: pathlib.Path, file_type: str) -> dict:
     print(f"The following questions are about the file {file.name}:")
+    # Show the idle parts of the video (from the cached analysis)
+    if file_type == "video":
+        idle_ranges = getIdleRanges(file)
+        if len(idle_ranges) != 0:
+            print(
+                f"It's idle for {sum(x[1] - x[0] for x in idle_ranges)} seconds which will be skipped: "
+                + ", ".join(f"{x[0]}-{x[1]}" for x in idle_ranges)
+            )
     # Ask if they even want to modify this file
     wanted = getIntBool(
         "Do you want to make additional modification to this file: Yes [0] or No [1]?\n"
@@ -2482,44 +3952,28 @@ def ImageVideo(
     file: pathlib.Path,
     resized_image: pathlib.Path,
     image_video: pathlib.Path,
-    index: int,
+    image_length: float,
 ) -> None:
-    # Creating the concat file
-    concat_image = pathlib.Path.joinpath(timelapse_args.temp_directory, "image.txt")
-    logger.info(f'Creating the image concat file at "{concat_image}"')
-    # The speed factor for images is how many seconds you want to image to last
-    output_frames = int(
-        round(user_answers[file][index]["speed_factor"] * timelapse_args.output_fps, 0)
-    )
-    # Replace apostrophes in the file with the escape sequence ffmpeg needs
-    # file_string = str(file.resolve().absolute())
-    file_string = str(resized_image.resolve())
-    file_string = file_string.replace("'", "'\\''")
-    # New str to actually use
-    temp_str = ""
-    # Write a line fore each frame we want output
-    for frame in range(output_frames):
-        temp_str += f"file '{file_string}'\n"
-    # Write the file
-    with open(concat_image, "w+") as wfile:
-        wfile.write(temp_str)
-    logger.info(f'Created the image concat file at "{concat_image}"')
-    # Creating the video from the concat file
+    output_frames = int(round(image_length * timelapse_args.output_fps, 0))
+    # Creating the video by repeating the decoded image (so it's only read and decoded once)
     start = time.perf_counter()
     logger.info(f'Creating the video "{image_video}" from the image "{file}"')
-    # Have to scale the image for this to work ... should probably actualyl scale all the videos to a desired resolution just in case they're not all the same resolution for some reason ... even though they should be
-    # image_terms = f'ffmpeg -f concat -safe 0 -i "{concat_image}" -vf "settb=AVTB,setpts=N/{timelapse_args.output_fps}/TB,{resize_vf}" "{image_video}"'  # Maybe don't need to resize again
-    image_terms = f'ffmpeg -f concat -safe 0 -i "{concat_image}" -vf "settb=AVTB,setpts=N/{timelapse_args.output_fps}/TB" "{image_video}"'
-    runFFmpeg(image_terms)
+    image_terms = f'ffmpeg -i "{resized_image}" '
+    image_terms += f'-vf "loop=loop={output_frames - 1}:size=1:start=0,settb=AVTB,setpts=N/{timelapse_args.output_fps}/TB" '
+    # The video doesn't change so it only needs the first keyframe
+    # Use the same pixel format as the video clips so the clips copied from it can be concatenated without encoding
+    image_terms += f"-c:v libx265 -r {timelapse_args.output_fps} -pix_fmt yuv420p "
+    image_terms += x265Params(
+        [f"keyint={output_frames}", f"min-keyint={output_frames}", "scenecut=0"]
+    )
+    image_terms += f'"{image_video}"'
+    return_code = runFFmpeg(image_terms)
     end = time.perf_counter()
     duration = end - start
+    if return_code != 0:
+        logger.warning(f'FFmpeg failed to create the video "{image_video}"')
+        return
     logger.info(f'Created the video "{image_video}" after {duration} seconds')
-    # Deleting the concat file
-    delLog(
-        concat_image,
-        "Deleting the temporary image concat file",
-        "Deleted the temporary image concat file",
-    )
 
 
 # Function to check if we're making a video from an image
@@ -2527,11 +3981,12 @@ def logImageVideo(
     file: pathlib.Path,
     resized_image: pathlib.Path,
     image_video: pathlib.Path,
-    index: int,
+    image_length: float,
 ) -> None:
     logger.info(f'Creating the video for the image at "{file}"')
     start = time.perf_counter()
-    ImageVideo(file, resized_image, image_video, index)
+    ImageVideo(file, resized_image, image_video, image_length)
+    planned_lengths[image_video] = getImageLength(image_length)
     end = time.perf_counter()
     duration = end - start
     logger.info(
@@ -2539,30 +3994,43 @@ def logImageVideo(
     )
 
 
-# Function to create the modified video from the image video
+# Function to create the clip of an image from the image video
 def logModifiedImageVideo(
     file: pathlib.Path,
     image_video: pathlib.Path,
     image_video_out: pathlib.Path,
     index: int,
-) -> None:
+) -> bool:
     start = time.perf_counter()
     logger.info(f'Creating new timelapse of "{image_video}" at "{image_video_out}"')
-    timelapseVideo(
-        image_video,
-        image_video_out,
-        0,
-        user_answers[file][index]["clip_in"],
-        user_answers[file][index]["clip_out"],
-        user_answers[file][index]["clip_from_end"],
-        user_answers[file][index]["fade_in"],
-        user_answers[file][index]["fade_out"],
-    )
+    # Every frame is the same image so the clip is just the start of the image video
+    clip_length = getPlannedLength(image_video_out)
+    # If it's not faded copy it
+    if user_answers[file][index]["fade_in"] == 0 and user_answers[file][index]["fade_out"] == 0:
+        success = (
+            runFFmpeg(f'ffmpeg -i "{image_video}" -t {clip_length} -c copy "{image_video_out}"')
+            == 0
+        )
+    # If it is cut and fade it in one pass
+    else:
+        success = timelapseVideo(
+            image_video,
+            image_video_out,
+            0,
+            0,
+            clip_length,
+            False,
+            user_answers[file][index]["fade_in"],
+            user_answers[file][index]["fade_out"],
+            timelapse_args.threads,
+            getPlannedLength(image_video),
+        )
     end = time.perf_counter()
     duration = end - start
     logger.info(
         f'Successfully created a timelapse of "{image_video}" after {duration} seconds'
     )
+    return success
 
 
 # Function to check if resolution matches
@@ -2577,147 +4045,158 @@ def checkResolution(file: pathlib.Path) -> bool:
         return True
 
 
-# Function to resize the image to the output size
-def resizeImage(file: pathlib.Path, resized_image: pathlib.Path) -> None:
+# Function to resize an image with Pillow (fitting or cropping it like resize_vf, returns False if Pillow can't convert it)
+def pillowResize(file: pathlib.Path, resized_image: pathlib.Path) -> bool:
+    width = timelapse_args.width
+    height = timelapse_args.height
+    with Image.open(file) as source:
+        # Converting 16 bit and float images to RGB clips the values instead of scaling them, so FFmpeg resizes those
+        if source.mode not in pillow_modes:
+            logger.info(f'The image "{file}" is {source.mode}, resizing it with FFmpeg')
+            return False
+        source = source.convert("RGB")
+        # Scale it to fit in the output (or cover it if the clips are cropped)
+        if resize_mode == "crop":
+            scale = max(width / source.width, height / source.height)
+        else:
+            scale = min(width / source.width, height / source.height)
+        scaled_width = max(1, int(round(source.width * scale)))
+        scaled_height = max(1, int(round(source.height * scale)))
+        scaled = source.resize((scaled_width, scaled_height), Image.LANCZOS)
+        # Center it on a black image of the output size (cropping what doesn't fit)
+        resized = Image.new("RGB", (width, height))
+        resized.paste(scaled, ((width - scaled_width) // 2, (height - scaled_height) // 2))
+        resized.save(resized_image)
+    return True
+
+
+# Function to resize the image to the output size (returns the image to use)
+def resizeImage(file: pathlib.Path, resized_image: pathlib.Path) -> pathlib.Path:
+    # If it's already the output size use it as it is
+    if checkResolution(file):
+        logger.info(f'The image "{file}" is already the output size')
+        return file
+    # Check if the resized file already exists
+    if checkPath(resized_image):
+        # Keep the existing file if that setting isn't enabled
+        if not timelapse_args.override_temp_video:
+            return resized_image
+        delLog(
+            resized_image,
+            "Deleting existing resized image",
+            "Deleted existing resized image",
+        )
     # Creating a scaled version of the image
     start = time.perf_counter()
     logger.info(f'Resizing the image "{file}" at "{resized_image}"')
-    # Compare the resolutions
-    matching_resolution = checkResolution(file)
-    if not matching_resolution:
-        resize_terms = f'ffmpeg -i "{file}" -vf "{resize_vf}" "{resized_image}"'
-    else:
-        resize_terms = f'ffmpeg -i "{file}" "{resized_image}"'
-    runFFmpeg(resize_terms)
+    if Image is None or not pillowResize(file, resized_image):
+        runFFmpeg(f'ffmpeg -i "{file}" -vf "{resize_vf}" "{resized_image}"')
     end = time.perf_counter()
     duration = end - start
     logger.info(f'Created the resized image "{resized_image}" after {duration} seconds')
+    return resized_image
+
+
+# Function to resize many images at the same time (returns the image to use for each)
+def resizeImages(images: List[pathlib.Path]) -> Dict[pathlib.Path, pathlib.Path]:
+    resized_images = {}
+    if len(images) == 0:
+        return resized_images
+    logger.info(f"Resizing {len(images)} images")
+    start = time.perf_counter()
+    # Pillow releases the GIL while it decodes and resizes, and FFmpeg runs in its own process
+    workers = min(len(images), os.cpu_count() or 1)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(
+                resizeImage,
+                image,
+                pathlib.Path.joinpath(
+                    timelapse_args.temp_directory, f"{image.stem}_r{image.suffix}"
+                ),
+            ): image
+            for image in images
+        }
+        for future in concurrent.futures.as_completed(futures):
+            resized_images[futures[future]] = future.result()
+    end = time.perf_counter()
+    duration = end - start
+    logger.info(f"Resized {len(images)} images after {duration} seconds")
+    return resized_images
 
 
 # Function to handle creating the videos from all the images
 def createImage(image_files: list) -> None:
-    # Turn every video into a timelapse
+    # Get the clips of every image that need to be created
+    render_clips = {}
     for image in image_files:
-        # Creating the modified versions
         image_settings = user_answers[image]
-        # For every clip we're making for that file
-        # for index, clips in enumerate(video_settings):
+        render_clips[image] = []
         for index in range(len(image_settings)):
             # The final output
             output = pathlib.Path.joinpath(
                 timelapse_args.temp_directory, f"{image.stem}_{index}.mp4"
             )
-            # Check that the end output image video doesn't exist first
-            if checkPath(output):
-                # Delete the existing file if that setting is enabled
-                if timelapse_args.override_temp_video:
-                    delLog(
-                        output,
-                        "Deleting existing temp video created from image",
-                        "Deleted existing temp video created from image",
-                    )
-                    # Check if a version of it already exists
-                    image_video = pathlib.Path.joinpath(
-                        timelapse_args.temp_directory, f"{image.stem}.mp4"
-                    )
-                    # Modifying the image
-                    resized_image = pathlib.Path.joinpath(
-                        timelapse_args.temp_directory, f"{image.stem}_r{image.suffix}"
-                    )
-                    # Check if the resized file already exists
-                    if checkPath(resized_image):
-                        # Delete the existing file if that setting is enabled
-                        if timelapse_args.override_temp_video:
-                            delLog(
-                                output,
-                                "Deleting existing temp video created from image",
-                                "Deleted existing temp video created from image",
-                            )
-                            resizeImage(image, resized_image)
-                            # Creating the modified versions
-                            image_settings = user_answers[image]
-                    # If it doesn't create it
-                    else:
-                        resizeImage(image, resized_image)
-                    # Creating the base video of the image
-                    if checkPath(image_video):
-                        # Delete the existing file if that setting is enabled
-                        if timelapse_args.override_temp_video:
-                            delLog(
-                                image_video,
-                                "Deleting existing temp video created from image",
-                                "Deleted existing temp video created from image",
-                            )
-                            # Create the new timelapse
-                            logImageVideo(image, resized_image, image_video, index)
-                    # If the file doesn't exist just create it
-                    else:
-                        # Create the new timelapse
-                        logImageVideo(image, resized_image, image_video, index)
-                    # Create the new timelapse
-                    logModifiedImageVideo(image, image_video, output, index)
-                    # Deleting the temporary video
-                    delLog(
-                        image_video,
-                        "Deleting the temporary image video",
-                        "Deleted the temporary image video",
-                    )
-            # If the file doesn't exist just create it
-            else:
-                # Check if a version of it already exists
-                image_video = pathlib.Path.joinpath(
-                    timelapse_args.temp_directory, f"{image.stem}.mp4"
-                )
-                # Modifying the image
-                resized_image = pathlib.Path.joinpath(
-                    timelapse_args.temp_directory, f"{image.stem}_r{image.suffix}"
-                )
-                # Check if the resized file already exists
-                if checkPath(resized_image):
-                    # Delete the existing file if that setting is enabled
-                    if timelapse_args.override_temp_video:
-                        delLog(
-                            output,
-                            "Deleting existing temp video created from image",
-                            "Deleted existing temp video created from image",
-                        )
-                        resizeImage(image, resized_image)
-                        # Creating the modified versions
-                        image_settings = user_answers[image]
-                # If it doesn't create it
-                else:
-                    resizeImage(image, resized_image)
-                # Creating the base video of the image
-                if checkPath(image_video):
-                    # Delete the existing file if that setting is enabled
-                    if timelapse_args.override_temp_video:
-                        delLog(
-                            image_video,
-                            "Deleting existing temp video created from image",
-                            "Deleted existing temp video created from image",
-                        )
-                        # Create the new timelapse
-                        logImageVideo(image, resized_image, image_video, index)
-                # If the file doesn't exist just create it
-                else:
-                    # Create the new timelapse
-                    logImageVideo(image, resized_image, image_video, index)
-                # Create the new timelapse
-                logModifiedImageVideo(image, image_video, output, index)
-                # Deleting the temporary video
-                delLog(
-                    image_video,
-                    "Deleting the temporary image video",
-                    "Deleted the temporary image video",
-                )
-        # Deleting the resized image and concat file
+            # Check that the end output image video needs to be created
+            key = renderKey(image, image_settings[index], "image")
+            if needsRender(
+                output,
+                key,
+                timelapse_args.override_temp_video,
+                "Deleting existing temp video created from image",
+                "Deleted existing temp video created from image",
+            ):
+                render_clips[image].append((index, output, key))
+    # Duplicate images are only resized and turned into a base video once
+    image_groups = {}
+    for image in image_files:
+        if len(render_clips[image]) != 0:
+            unique_image = duplicate_images.get(image, image)
+            image_groups.setdefault(unique_image, []).append(image)
+    # Resize all the images that have clips to create at the same time
+    resized_images = resizeImages(list(image_groups.keys()))
+    # Turn every image into its clips
+    for unique_image, images in image_groups.items():
+        resized_image = resized_images[unique_image]
+        # Path of the base video of the image
+        image_video = pathlib.Path.joinpath(
+            timelapse_args.temp_directory, f"{unique_image.stem}.mp4"
+        )
+        # The base video is as long as the longest clip of the images
+        if checkPath(image_video):
+            delLog(
+                image_video,
+                "Deleting existing temp video created from image",
+                "Deleted existing temp video created from image",
+            )
+        image_length = max(
+            user_answers[image][index]["speed_factor"]
+            for image in images
+            for index, output, key in render_clips[image]
+        )
+        logImageVideo(unique_image, resized_image, image_video, image_length)
+        # Create the clips of every image from the base video
+        for image in images:
+            for index, output, key in render_clips[image]:
+                success = logModifiedImageVideo(image, image_video, output, index)
+                # Record what the timelapse was rendered from
+                recordRender(output, key, success)
+        # Deleting the temporary video
         delLog(
-            resized_image,
-            "Deleting the temporary resized image",
-            "Deleted the temporary resized image",
+            image_video,
+            "Deleting the temporary image video",
+            "Deleted the temporary image video",
         )
-        # Delete the source image file if that setting is enabled
-        if timelapse_args.delete_video:
+        # Deleting the resized image (if the image had to be resized)
+        if resized_image != unique_image:
+            delLog(
+                resized_image,
+                "Deleting the temporary resized image",
+                "Deleted the temporary resized image",
+            )
+    # Delete the source image files if that setting is enabled
+    if timelapse_args.delete_video:
+        for image in image_files:
             delLog(image, "Deleting existing image", "Deleted existing image")
 
 
@@ -2764,7 +4243,12 @@ def checkOrder(custom_order: dict, user_answers: dict) -> bool:
         # Get the amount of clips
         for index in range(len(data)):
             # Generate paths
-            if file.suffix.lower() in [".mp4", ".mkv"]:
+            if file.is_dir():
+                new_path = pathlib.Path.joinpath(
+                    timelapse_args.temp_directory, f"{file.name}_sequence_{index}.mp4"
+                )
+                video[new_path] = file
+            elif file.suffix.lower() in [".mp4", ".mkv"]:
                 new_path = pathlib.Path.joinpath(
                     timelapse_args.temp_directory, f"{file.stem}_{index}{file.suffix}"
                 )
@@ -2814,63 +4298,159 @@ def getTotals(user_answers: dict) -> List[float]:
     for file, data in user_answers.items():
         # Get the amount of clips
         for index in range(len(data)):
-            # Get the lengths
-            if file.suffix.lower() in [".mp4", ".mkv", ".wav", ".mp3"]:
-                # If it's a video or audio file
-                if data[index]["clip_in"] != 0 or data[index]["clip_out"] != 0:
-                    clipped_duration = getClipTime(
-                        file,
-                        data[index]["clip_in"],
-                        data[index]["clip_out"],
-                        data[index]["clip_from_end"],
-                        False,
-                    )["output_length"]
-                else:
-                    clipped_duration = getLength(file)
-                # Speed up the length
-                if (
-                    data[index]["speed_factor"] != 0
-                    and data[index]["speed_factor"] != 1
-                ):
-                    sped_duration = clipped_duration / data[index]["speed_factor"]
-                else:
-                    sped_duration = clipped_duration
-                # Add the time to the list
-                if file.suffix.lower() in [".mp4", ".mkv"]:  # If a video
-                    total_video += sped_duration
-                else:  # If audio
-                    total_audio += sped_duration
+            # Get the planned lengths
+            if file.is_dir():
+                # If it's an image sequence
+                new_path = pathlib.Path.joinpath(
+                    timelapse_args.temp_directory, f"{file.name}_sequence_{index}.mp4"
+                )
+                total_video += planned_lengths[new_path]
+            elif file.suffix.lower() in [".mp4", ".mkv"]:
+                # If it's a video
+                new_path = pathlib.Path.joinpath(
+                    timelapse_args.temp_directory, f"{file.stem}_{index}{file.suffix}"
+                )
+                total_video += planned_lengths[new_path]
             elif file.suffix.lower() in [".png", ".jpg"]:
                 # If it's an image file
-                if data[index]["clip_in"] != 0 or data[index]["clip_out"] != 0:
-                    if data[index]["clip_from_end"]:
-                        # Get the time to cut at
-                        new_duration = (
-                            data[index]["speed_factor"] - data[index]["clip_out"]
-                        )
-                    # If we are passing in the actual time to clip at
-                    else:
-                        new_duration = data[index]["clip_out"]
-                    # Getting the new length after both buts
-                    clipped_duration = new_duration - data[index]["clip_in"]
-                else:
-                    clipped_duration = data[index]["speed_factor"]
-                # Speed up the length
-                if (
-                    data[index]["speed_factor"] != 0
-                    and data[index]["speed_factor"] != 1
-                ):
-                    sped_duration = clipped_duration / data[index]["speed_factor"]
-                else:
-                    sped_duration = clipped_duration
-                # Add the time to the list
-                total_video += sped_duration
+                new_path = pathlib.Path.joinpath(
+                    timelapse_args.temp_directory, f"{file.stem}_{index}.mp4"
+                )
+                total_video += planned_lengths[new_path]
+            elif file.suffix.lower() in [".wav", ".mp3"]:
+                # If it's audio
+                new_path = pathlib.Path.joinpath(
+                    timelapse_args.temp_directory, f"{file.stem}_{index}{file.suffix}"
+                )
+                total_audio += planned_lengths[new_path]
             else:
                 # If it's some file type it shouldn't be ... this shouldn't happen
                 logger.error(f'Huh, that file "{file}" shouldn\'t exist.')
     return [total_video, total_audio]
 
 
+# Function to run stages as soon as the stages they depend on are finished
+def runStages(stages: Dict[str, Tuple[Callable[[], None], List[str]]]) -> None:
+    # Variables to store the progress of the stages
+    finished = set()
+    running = {}
+    waiting = dict(stages)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(stages)) as executor:
+        while waiting or running:
+            # Start every stage that has all of its inputs
+            for name, (stage, depends) in list(waiting.items()):
+                if all(depend in finished for depend in depends):
+                    logger.info(f'Starting the "{name}" stage')
+                    running[executor.submit(stage)] = name
+                    del waiting[name]
+            # If nothing can run the stages can't be finished
+            if not running:
+                logger.critical(
+                    f'The stages {", ".join(waiting)} depend on stages that don\'t exist'
+                )
+                sys.exit()
+            # Wait for a stage to finish
+            done, pending = concurrent.futures.wait(
+                running, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            for future in done:
+                name = running.pop(future)
+                # Raise any errors from the stage
+                future.result()
+                finished.add(name)
+                logger.info(f'Finished the "{name}" stage')
+
+
+# Stage to create the timelapses from the videos
+def stageVideo() -> None:
+    # If there are videos
+    if len(video_files) != 0:
+        # Create timelapses
+        createTimelapses(video_files)
+
+
+# Stage to create the modified audio
+def stageAudio() -> None:
+    # If there is audio
+    if len(audio_files) != 0:
+        # Create the modified audio
+        createAudio(audio_files)
+
+
+# Stage to create the videos from the images
+def stageImage() -> None:
+    # If there are images in the video directory
+    if len(image_files) != 0:
+        # Convert the images into videos
+        createImage(image_files)
+
+
+# Stage to combine the temp videos
+def stageCombinedVideo() -> None:
+    # Create an updated list of all the temp videos
+    timelapse_video_files = getFiles(timelapse_args.temp_directory, [".mp4", ".mkv"])
+    # If there are temp videos
+    if len(timelapse_video_files) != 0:
+        # Creating the concat of the timelapse videos
+        createCombinedTimelapse(timelapse_video_files)
+
+
+# Stage to combine the temp audio
+def stageCombinedAudio() -> None:
+    # Create an updated list of all the temp audio
+    timelapse_audio_files = getFiles(timelapse_args.temp_directory, [".wav", ".mp3"])
+    # If there is temp audio
+    if len(timelapse_audio_files) != 0:
+        # Combine the audio files
+        createCombinedAudio(timelapse_audio_files)
+
+
+# Stage to combine the audio and video
+def stageAddAudio() -> None:
+    # Get the paths where the files should be
+    video_out = pathlib.Path.joinpath(timelapse_args.output_directory, "timelapse.mp4")
+    audio_out = pathlib.Path.joinpath(timelapse_args.output_directory, "audio.wav")
+    # Check if they exist
+    if checkPath(video_out) and checkPath(audio_out):
+        addAudio(video_out, audio_out)
+
+
+# Stage to create the modified output if using it
+def stageModifiedOutput() -> None:
+    if timelapse_args.resize != 0 or timelapse_args.compression_level != -1:
+        # Get the paths where they should be
+        video_out = pathlib.Path.joinpath(
+            timelapse_args.output_directory, "timelapse.mp4"
+        )
+        video_out_audio = pathlib.Path.joinpath(
+            timelapse_args.output_directory, "timelapse_audio.mp4"
+        )
+        # If the audio timelapse exists use that
+        if checkPath(video_out_audio):
+            modifyOutput(video_out_audio, True)
+        # If no audio timelapse exists use the main timelapse
+        elif checkPath(video_out):
+            modifyOutput(video_out, False)
+
+
+# Stage to create the renditions if using them
+def stageRenditions() -> None:
+    if len(timelapse_args.renditions) != 0:
+        # Get the paths where they should be
+        video_out = pathlib.Path.joinpath(
+            timelapse_args.output_directory, "timelapse.mp4"
+        )
+        video_out_audio = pathlib.Path.joinpath(
+            timelapse_args.output_directory, "timelapse_audio.mp4"
+        )
+        # If the audio timelapse exists use that
+        if checkPath(video_out_audio):
+            createRenditions(video_out_audio, True)
+        # If no audio timelapse exists use the main timelapse
+        elif checkPath(video_out):
+            createRenditions(video_out, False)
+
+
 # Command line arguments
 parser = argparse.ArgumentParser(
     prog="Timelapse Maker",
@@ -2890,6 +4470,13 @@ parser.add_argument(
     type=int,
     default=-1,
 )
+parser.add_argument(
+    "-j",
+    "--jobs",
+    help="How many clips to render at the same time. The CPU cores are split between the jobs. Pass in 0 to pick an amount from the CPU cores. Default: 1",
+    type=int,
+    default=1,
+)
 parser.add_argument(
     "-il",
     "--image_length",
@@ -2959,6 +4546,13 @@ parser.add_argument(
     type=int,
     default=1080,
 )
+parser.add_argument(
+    "-rl",
+    "--renditions",
+    help='Extra outputs to make from the output in one pass, as a comma separated list of WIDTHxHEIGHT:CRF:MODE. MODE is fit (padded) or crop. The clips are rendered at the size of the largest fit rendition (or the largest crop if they are all crop), which replaces the width and height (larger if a rendition would have to be scaled up from it). Example: "1920x1080:23:fit,1280x720:26:fit,1080x1920:23:crop"',
+    type=str,
+    default="",
+)
 parser.add_argument(
     "-v",
     "--video_directory",
@@ -2989,6 +4583,13 @@ parser.add_argument(
     help="Path to the settings directory. Default: ./settings",
     type=pathlib.Path,
 )
+parser.add_argument(
+    "-pcs",
+    "--probe_cache_size",
+    help="How many files to remember the ffprobe results of between runs (saved in the settings directory). Default: 10000, 0 to not save them",
+    type=int,
+    default=10000,
+)
 parser.add_argument(
     "-osp",
     "--override_source_path",
@@ -3055,6 +4656,59 @@ parser.add_argument(
     type=float,
     default=0,
 )
+parser.add_argument(
+    "-fsu",
+    "--fast_speedup",
+    help="Only decodes the keyframes of a video when the speed factor skips more than the time between them",
+    action="store_true",
+)
+parser.add_argument(
+    "-kfo",
+    "--keyframe_only",
+    help="Only decodes the keyframes of the videos and repeats them to keep the speed factor (for very large speed factors)",
+    action="store_true",
+)
+parser.add_argument(
+    "-si",
+    "--skip_idle",
+    help="Skips the parts of the videos that change less than this every second (the average difference of the gray pixels from 0 to 255, try 1). Not used with --preserve_audio. Needs NumPy. Default: 0 to disable",
+    type=float,
+    default=0,
+)
+parser.add_argument(
+    "-mil",
+    "--min_idle_length",
+    help="How many seconds a video has to be idle for it to be skipped. Default: 5",
+    type=float,
+    default=5,
+)
+parser.add_argument(
+    "-vsp",
+    "--variable_speed",
+    help="How much the speed of the videos follows their activity, so the output spends more time on the active parts. The clips keep the length of their speed factor. 1 makes the output time of every part follow its activity. Not used with --preserve_audio. Needs NumPy. Default: 0 to disable",
+    type=float,
+    default=0,
+)
+parser.add_argument(
+    "-sqf",
+    "--sequence_fps",
+    help="How many frames per second the image sequences (directories of numbered images in the video directory) are before they're sped up. Default: 30",
+    type=float,
+    default=30,
+)
+parser.add_argument(
+    "-dd",
+    "--dedup",
+    help="Only decodes and encodes duplicate images and image sequence frames once, the duplicate frames of a sequence are shown for longer instead. 0 only uses identical files, higher also uses images whose perceptual hash differs by up to this many of its 64 bits (try 4). Default: -1 to disable",
+    type=int,
+    default=-1,
+)
+parser.add_argument(
+    "-smf",
+    "--smart_fade",
+    help="Only encodes the start and end of the output video when fading it, the middle is copied (not used with --preserve_audio)",
+    action="store_true",
+)
 parser.add_argument(
     "-movfi",
     "--modified_output_video_fade_in",
@@ -3285,8 +4939,86 @@ if timelapse_args.verbose:
 else:
     logger.setLevel(logging.WARNING)
 
+# How many keyframes are read when probing to find the keyframe interval
+keyframe_count = 2
+# The render key of a temp file that's being rendered (so a stopped run's file isn't reused)
+pending_key = "pending"
+# The CRF of the output (libx265's default, since the clips and the output are encoded without one)
+output_crf = 28
+# How many files can be probed at the same time
+max_probe_jobs = 16
+# How many images get their perceptual hash from one FFmpeg call (a failed image loses the hashes of its batch)
+dedup_batch = 256
+# How many of the previous unique images an image is compared to when looking for near duplicates
+dedup_window = 16
+# The frames of the image sequences and how they're read
+sequence_frames = {}
+sequence_inputs = {}
+sequence_identities = {}
+# Reentrant because the frame list is built while holding it
+sequence_lock = threading.RLock()
+# The images that are duplicates of other images and the runs of duplicate frames of the image sequences
+duplicate_images = {}
+sequence_runs = {}
+# The image modes Pillow can convert to RGB without losing their range (8 bits per channel)
+pillow_modes = ["1", "L", "LA", "La", "P", "PA", "RGB", "RGBA", "RGBa", "RGBX", "CMYK", "YCbCr"]
+# The size and rate of the frames used to analyse the activity of the videos
+analysis_width = 64
+analysis_fps = 1
+# How many seconds of a video each speed of the variable speed is used for
+variable_speed_window = 30
+# The values in the metadata record of a probed file (the keyframe interval is only added when it's needed)
+probe_fields = [
+    "duration",
+    "resolution",
+    "framerate",
+    "codec",
+    "profile",
+    "pix_fmt",
+    "time_base",
+    "sample_rate",
+    "audio_codec",
+]
+
+# Load the ffprobe results from previous runs
+probe_cache = ProbeCache(
+    pathlib.Path.joinpath(timelapse_args.settings_directory, "probe_cache.json"),
+    timelapse_args.probe_cache_size,
+)
+probe_cache.load()
+
+# Load what the existing temp files were rendered from
+render_cache = RenderCache(
+    pathlib.Path.joinpath(timelapse_args.temp_directory, "render_cache.json")
+)
+render_cache.load()
+
+# Load the activity of the videos analysed in previous runs
+analysis_cache = AnalysisCache(
+    pathlib.Path.joinpath(timelapse_args.settings_directory, "analysis")
+)
+if np is not None:
+    analysis_cache.load()
+
+# Load the hashes of the images and frames from previous runs
+dedup_cache = DedupCache(
+    pathlib.Path.joinpath(timelapse_args.settings_directory, "dedup_cache.json")
+)
+if timelapse_args.dedup != -1:
+    dedup_cache.load()
+
+# If the largest rendition is cropped the clips have to be cropped too (fit pads them)
+resize_mode = "fit"
+if len(timelapse_args.renditions) != 0 and timelapse_args.renditions[0]["mode"] == "crop":
+    resize_mode = "crop"
 # Variable to store the resize command that will be used many times
-resize_vf = f"scale={timelapse_args.width}:{timelapse_args.height}:force_original_aspect_ratio=1,pad={timelapse_args.width}:{timelapse_args.height}:(( (ow - iw)/2 )):(( (oh - ih)/2 ))"
+resize_vf = renditionFilter(
+    {
+        "width": timelapse_args.width,
+        "height": timelapse_args.height,
+        "mode": resize_mode,
+    }
+)
 
 # If the clear options are enabled clear the directories
 if timelapse_args.clear_output:
@@ -3340,9 +5072,25 @@ if timelapse_args.clear_custom_order:
 
 # Get the files
 video_files = getFiles(timelapse_args.video_directory, [".mp4", ".mkv"])
+# The image sequences (directories of frames) are used like videos
+video_files += getSequences(timelapse_args.video_directory)
 audio_files = getFiles(timelapse_args.audio_directory, [".wav", ".mp3"])
 image_files = getFiles(timelapse_args.video_directory, [".png", ".jpg"])
 
+# Probe all the source files at the same time (for the prompts, length check, and rendering)
+probeFiles(video_files + audio_files + image_files)
+
+# Find the duplicate images and frames if deduplicating them
+if timelapse_args.dedup != -1:
+    dedupFiles(image_files, [file for file in video_files if file.is_dir()])
+    dedup_cache.save()
+
+# Analyse the activity of the videos if skipping the idle parts or using variable speed
+if (
+    timelapse_args.skip_idle != 0 or timelapse_args.variable_speed != 0
+) and not timelapse_args.preserve_audio:
+    analyseFiles(video_files)
+
 # Create a concat list of all the temp files (to ignore asking the user about them)
 timelapse_video_files = getFiles(timelapse_args.temp_directory, [".mp4", ".mkv"])
 timelapse_audio_files = getFiles(timelapse_args.temp_directory, [".wav", ".mp3"])
@@ -3371,6 +5119,11 @@ user_answers = promptFiles(image_files, timelapse_video_files, "image", user_ans
 if not timelapse_args.dont_save_settings:
     writeJson(json_file, user_answers, True)
 
+# Plan the length of every temp file (so the files the pipeline creates don't need to be probed)
+planned_lengths = planLengths(user_answers)
+# The outputs that were created in this run
+created_outputs = set()
+
 # Checking the video length against the audio length (if we're not ignoring it and we're using audio, and video for that matter)
 if (
     not timelapse_args.ignore_audio_check
@@ -3401,6 +5154,9 @@ if (
             sys.exit()
 
 
+# Save the probe results from the startup (so they aren't lost if the run is stopped)
+probe_cache.save()
+
 # If using custom order attempt to load them
 order_file = pathlib.Path.joinpath(timelapse_args.settings_directory, "order.json")
 if timelapse_args.use_custom_order and checkPath(order_file):
@@ -3450,56 +5206,24 @@ else:
 if not timelapse_args.dont_save_custom_order:
     writeJson(order_file, {"video": video_order, "audio": audio_order}, False)
 
-# If there are videos
-if len(video_files) != 0:
-    # Create timelapses
-    createTimelapses(video_files)
-
-# If there is audio
-if len(audio_files) != 0:
-    # Create the modified audio
-    createAudio(audio_files)
-
-# If there are images in the video directory
-if len(image_files) != 0:
-    # Convert the images into videos
-    createImage(image_files)
-
-# Create an updated concat list of all the temp files
-timelapse_video_files = getFiles(timelapse_args.temp_directory, [".mp4", ".mkv"])
-timelapse_audio_files = getFiles(timelapse_args.temp_directory, [".wav", ".mp3"])
+# Run the stages (each stage starts as soon as the stages it depends on are finished)
+# The video jobs split every core between them, so they wait for the image resizing and audio that use the cores too
+runStages(
+    {
+        "video": (stageVideo, ["image", "audio"]),
+        "audio": (stageAudio, []),
+        "image": (stageImage, []),
+        "combined_video": (stageCombinedVideo, ["video", "image"]),
+        "combined_audio": (stageCombinedAudio, ["audio"]),
+        "add_audio": (stageAddAudio, ["combined_video", "combined_audio"]),
+        "modified_output": (stageModifiedOutput, ["add_audio"]),
+        "renditions": (stageRenditions, ["add_audio"]),
+    }
+)
 
-# If there are temp videos
-if len(timelapse_video_files) != 0:
-    # Creating the concat of the timelapse videos
-    createCombinedTimelapse(timelapse_video_files)
-
-# If there is temp audio
-if len(timelapse_audio_files) != 0:
-    # Combine the audio files
-    createCombinedAudio(timelapse_audio_files)
-
-# Combine the audio and video
-# Get the paths where the files should be
-video_out = pathlib.Path.joinpath(timelapse_args.output_directory, "timelapse.mp4")
-audio_out = pathlib.Path.joinpath(timelapse_args.output_directory, "audio.wav")
-# Check if they exist
-if checkPath(video_out) and checkPath(audio_out):
-    addAudio(video_out, audio_out)
-
-# Create the modified output if using it
-if timelapse_args.resize != 0 or timelapse_args.compression_level != -1:
-    # Get the path where it should be
-    video_out_audio = pathlib.Path.joinpath(
-        timelapse_args.output_directory, "timelapse_audio.mp4"
-    )
-    # If the audio timelapse exists use that
-    if checkPath(video_out_audio):
-        modifyOutput(video_out_audio, True)
-    # If no audio timelapse exists use the main timelapse
-    elif checkPath(video_out):
-        modifyOutput(video_out, False)
 
+# Save the probe results
+probe_cache.save()
 
 # Deleting unwanted files/directories
 # If the directory for source files should be empty
@@ -3531,6 +5255,27 @@ if timelapse_args.delete_custom_order:
     )
 # Delete the settings directory if both are true
 if timelapse_args.delete_settings and timelapse_args.delete_custom_order:
+    delLog(
+        probe_cache.cache_file,
+        "Deleting the probe cache at",
+        "Deleted the probe cache at",
+    )
+    delLog(
+        dedup_cache.cache_file,
+        "Deleting the dedup cache at",
+        "Deleted the dedup cache at",
+    )
+    for file in analysis_cache.files():
+        delLog(
+            file,
+            "Deleting the analysis cache at",
+            "Deleted the analysis cache at",
+        )
+    delLog(
+        analysis_cache.cache_directory,
+        "Deleting the analysis cache directory ",
+        "Deleted the analysis cache directory ",
+    )
     delLog(
         timelapse_args.settings_directory,
         "Deleting the settings directory ",
@@ -3538,6 +5283,11 @@ if timelapse_args.delete_settings and timelapse_args.delete_custom_order:
     )
 # Deleting the temp directory if both temp audio and video have been removed
 if not timelapse_args.keep_temp_video and not timelapse_args.keep_temp_audio:
+    delLog(
+        render_cache.cache_file,
+        "Deleting the render cache at",
+        "Deleted the render cache at",
+    )
     delLog(
         timelapse_args.temp_directory,
         "Deleting the temp directory ",